@@ -0,0 +1,236 @@
+"""Times the engine's hot functions on fixed positions and compares runs.
+
+The corpora below never change, so two runs are timing the same work: a
+few opening, midgame and near-full positions, and positions where the side
+to move can win or has to block. The searches play for whichever side is
+to move. Each benchmark reports microseconds per call, nodes per second
+for the searches, and the peak memory Python allocated while it ran (for
+a search, on top of its freshly built engine), as JSON:
+
+    python benchmark.py --output before.json
+    python benchmark.py --compare before.json --output after.json
+
+``--compare`` prints every metric next to the baseline and exits with
+status 1 if one got worse by more than ``--threshold``.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import game
+from engine import Position
+
+# moves from the empty board, columns numbered from 1 like the text UI
+CORPORA = {
+    "opening": ["6477", "44433", "4442", "45634"],
+    "midgame": ["444334343357651", "444272454455556522", "45634445274355", "67424332443327256565"],
+    "near_full": ["456344452743553325312222164656631761", "3424133212322114734737277711666556",
+                  "7441414447233733677113662122236667", "43445333445335557667622122247757276"],
+    "threat": ["4443343433576", "444272454455556522322171", "45634445274355332", "674243324433272"],
+}
+
+ALL_EVS = (True,) * 6
+SEARCH_DEPTHS = (2, 4, 6)
+
+
+def load_position(moves):
+    """Plays the moves from the empty board, player 1 first"""
+    board = Position(game.ROWS, game.COLS, game.CONNECT)
+    player = game.PLAYER
+    for move in moves:
+        board.play(int(move) - 1, player)
+        player = game.COMPUTER if player == game.PLAYER else game.PLAYER
+    return board
+
+
+def to_move(board):
+    """Returns the player id to move on a board from load_position"""
+    return game.PLAYER if len(board.moves) % 2 == 0 else game.COMPUTER
+
+
+def windows(board):
+    """Returns the contents of every window on the board"""
+    return [[board.cell(row, col) for row, col in line] for line in board.lines.cells]
+
+
+def best_time(function, repeat):
+    """Returns the fastest of repeat runs of function, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(function):
+    """Returns the most memory in KiB Python allocated while running function once"""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def call_benchmark(calls, repeat):
+    """Times a list of zero-argument calls, reporting the time per call"""
+    def run():
+        for call in calls:
+            call()
+    seconds = best_time(run, repeat)
+    return {"calls": len(calls), "us_per_call": round(seconds / len(calls) * 1e6, 3), "peak_kib": round(peak_memory(run), 1)}
+
+
+def search_benchmark(searches, repeat):
+    """Times (setup, search) pairs, where search returns the engine that ran it
+
+    setup clears the tables and builds a fresh engine, and is left out of
+    both the time and the peak memory, so those only cover the search.
+    """
+    nodes = []
+    seconds = float("inf")
+    for _ in range(repeat):
+        nodes.clear()
+        elapsed = 0.0
+        for setup, search in searches:
+            setup()
+            start = time.perf_counter()
+            engine = search()
+            elapsed += time.perf_counter() - start
+            nodes.append(engine.nodes)
+        seconds = min(seconds, elapsed)
+    peak = 0.0
+    for setup, search in searches:
+        setup()
+        peak = max(peak, peak_memory(search))
+    total = sum(nodes)
+    return {
+        "calls": len(searches),
+        "us_per_call": round(seconds / len(searches) * 1e6, 3),
+        "nodes": total,
+        "nodes_per_sec": round(total / seconds),
+        "peak_kib": round(peak, 1),
+    }
+
+
+def fresh_engine(board, EFmode):
+    """A setup giving the side to move on board a new engine, like at the start of a game"""
+    def setup():
+        random.seed(0)
+        game.reset_search()
+        game.get_engine(EFmode, to_move(board))
+    return setup
+
+
+def minimax_call(board, depth, EFmode):
+    """A (setup, search) pair running the engine's minimax for the side to move on board"""
+    def search():
+        engine = game.get_engine(EFmode, to_move(board))
+        engine.sync(board)
+        engine.minimax(board, depth, True, -float("inf"), float("inf"))
+        return engine
+    return fresh_engine(board, EFmode), search
+
+
+def move_call(board, EFmode):
+    """A (setup, search) pair picking the text UI's move for the side to move on board"""
+    def search():
+        game.get_computer_move(board, EFmode, to_move(board))
+        return game.get_engine(EFmode, to_move(board))
+    return fresh_engine(board, EFmode), search
+
+
+def run_benchmarks(corpora, repeat):
+    """Runs every benchmark on every corpus and returns {name: metrics}"""
+    results = {}
+    for corpus, games in corpora.items():
+        boards = [load_position(moves) for moves in games]
+        results[f"check_winner/{corpus}"] = call_benchmark(
+            [lambda board=board, player=player: game.check_winner(board, player)
+             for board in boards for player in (game.PLAYER, game.COMPUTER)], repeat)
+        for label, EFmode in (("default", False), ("all_evs", ALL_EVS)):
+            results[f"evaluate_board/{label}/{corpus}"] = call_benchmark(
+                [lambda board=board: game.evaluate_board(board, EFmode) for board in boards], repeat)
+            results[f"evaluate_window/{label}/{corpus}"] = call_benchmark(
+                [lambda window=window: game.evaluate_window(window, game.COMPUTER, EFmode)
+                 for board in boards for window in windows(board)], repeat)
+        for depth in SEARCH_DEPTHS:
+            results[f"minimax/depth{depth}/{corpus}"] = search_benchmark(
+                [minimax_call(board, depth, ALL_EVS) for board in boards], repeat)
+        results[f"get_computer_move/{corpus}"] = search_benchmark(
+            [move_call(board, ALL_EVS) for board in boards], repeat)
+    return results
+
+
+# metric -> True if a bigger number is better
+METRICS = {"us_per_call": False, "nodes_per_sec": True, "peak_kib": False}
+
+
+def compare(results, baseline, threshold):
+    """Prints each metric against the baseline and returns the regressions"""
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            print(f"{name}: not in the baseline")
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in metrics or metric not in baseline[name]:
+                continue
+            old, new = baseline[name][metric], metrics[metric]
+            change = (new - old) / old if old else 0.0
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{name} {metric}")
+            print(f"{name} {metric}: {old} -> {new} ({change:+.1%}){flag}")
+        if baseline[name].get("nodes") != metrics.get("nodes"):
+            print(f"{name} nodes: {baseline[name].get('nodes')} -> {metrics.get('nodes')} (the search itself changed)")
+    return regressions
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark the Connect Four engine on fixed positions")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each benchmark, the fastest counts")
+    parser.add_argument("--corpus", choices=sorted(CORPORA), action="append", help="Only run this corpus (can be repeated)")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="How much worse a metric may get before it is flagged (0.10 = 10%%)")
+    parser.add_argument("--output", help="File the results are written to as JSON (default: print them)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    corpora = {name: CORPORA[name] for name in (args.corpus or CORPORA)}
+    start = time.perf_counter()
+    results = run_benchmarks(corpora, args.repeat)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seconds": round(time.perf_counter() - start, 2),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=1)
+    elif not args.compare:
+        print(json.dumps(report, indent=1))
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
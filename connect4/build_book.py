@@ -0,0 +1,56 @@
+"""Builds the opening book the AIs play their first moves from.
+
+Every position of the first ``--plies`` plies is searched ``--depth`` plies
+deep, far deeper than a game can afford per move, and the best move of the
+side to move is written to a binary book file. Pass that file to
+``game.py --book`` or ``tournament.py --book``. A book only answers for the
+EVs it was built with, so build one per AI:
+
+    python build_book.py --plies 4 --depth 8 --output book_default.bin
+    python build_book.py --plies 4 --depth 8 --ev1 --ev5 --output book_15.bin
+"""
+import argparse
+import random
+import time
+
+import game
+from engine import Engine, build_book, write_book
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="Build an opening book for the Connect Four AIs")
+    for number in range(1, 7):
+        parser.add_argument(f"--ev{number}", action="store_true", help=f"Build the book for an AI with Evaluation Function {number}")
+    parser.add_argument("--plies", type=int, default=4, help="Book every position with fewer disks than this")
+    parser.add_argument("--depth", type=int, default=8, help="Search depth of the minimax below each root move")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for breaking ties between equal moves")
+    parser.add_argument("--output", default="book.bin", help="File the book is written to")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+    evs = tuple(getattr(args, f"ev{number}") for number in range(1, 7))
+    # each side searches for itself so every entry is the side to move's best move
+    engines = {
+        player: Engine(player, evs, game.ROWS, game.COLS, game.CONNECT, depth=args.depth,
+                       tt_bytes=game.TT_SIZE_MB * 1024 * 1024)
+        for player in (game.PLAYER, game.COMPUTER)
+    }
+    start = time.perf_counter()
+    searched = []
+
+    def progress(position):
+        searched.append(position.key)
+        if len(searched) % 50 == 0:
+            print(f"{len(searched)} positions searched in {time.perf_counter() - start:.1f}s")
+
+    moves = build_book(engines, args.plies, game.ROWS, game.COLS, game.CONNECT, progress)
+    write_book(args.output, moves, game.ROWS, game.COLS, game.CONNECT, evs)
+    print(f"wrote {len(moves)} positions for {game.ev_label(evs)} to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
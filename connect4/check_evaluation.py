@@ -0,0 +1,128 @@
+"""Checks that every way of scoring a position gives the same, unchanged scores.
+
+The engine scores windows from a table built once per EV set
+(``evaluation.pattern_table``), keeps the sum up to date move by move
+(``IncrementalEvaluator``) and scores stacks of boards with NumPy
+(``BatchEvaluator``). This checks that
+
+- every table entry is what ``score_window`` works out rule by rule, for
+  all 64 EV sets, both players and several board sizes,
+- the tables for a 7-wide, connect-4 board still match the scores the EV
+  rules gave when the tables were introduced (``FINGERPRINTS``), so a
+  changed rule shows up here too,
+- evaluate_board, the incremental evaluator and the batch evaluator agree
+  on random positions:
+
+    python check_evaluation.py
+    python check_evaluation.py --games 2000 --seed 7
+
+Exits with status 1 on the first disagreement. A deliberate change to the
+EV rules has to update FINGERPRINTS.
+"""
+import argparse
+import itertools
+import random
+import sys
+
+import game
+from engine import BatchEvaluator, Engine, Position
+from engine.evaluation import evaluate_board, pattern_table, score_window
+
+ALL_EV_SETS = list(itertools.product((False, True), repeat=6))
+# rows, cols, connect
+SIZES = ((6, 7, 4), (6, 7, 3), (7, 8, 5), (5, 9, 4))
+
+# EV numbers switched on -> (sum of scores, sum of code * score) of the
+# pattern table of player 1 and of player 2, on a 7-wide board with
+# connect 4. EV2, EV5 and EV6 never fire on 4-cell windows, so their tables
+# are the default one.
+FINGERPRINTS = {
+    (): ((116, 3880), (116, 9200)),
+    (1,): ((224, 8200), (224, 14384)),
+    (2,): ((116, 3880), (116, 9200)),
+    (3,): ((332, 12520), (332, 20144)),
+    (4,): ((100, 3240), (100, 8880)),
+    (5,): ((116, 3880), (116, 9200)),
+    (6,): ((116, 3880), (116, 9200)),
+    (1, 2, 3, 4, 5, 6): ((424, 16200), (424, 25008)),
+}
+
+
+def fingerprint(table):
+    """Returns the sum of a pattern table's scores and of each score times its code"""
+    return sum(table), sum(code * score for code, score in enumerate(table))
+
+
+def check_tables():
+    """Returns what is wrong with the pattern tables, or None"""
+    for rows, cols, connect in SIZES:
+        for evs in ALL_EV_SETS:
+            for player in (1, 2):
+                table = pattern_table(player, evs, cols, connect)
+                for code, score in enumerate(table):
+                    window = tuple(code // 3 ** place % 3 for place in range(connect))
+                    expected = score_window(window, player, evs, cols)
+                    if score != expected:
+                        return (f"{game.ev_label(evs)}, player {player}, {cols} columns, connect {connect}: "
+                                f"window {window} scores {score} in the table, {expected} by the rules")
+    for numbers, expected in FINGERPRINTS.items():
+        evs = tuple(number in numbers for number in range(1, 7))
+        found = tuple(fingerprint(pattern_table(player, evs, 7, 4)) for player in (1, 2))
+        if found != expected:
+            return f"{game.ev_label(evs)}: the pattern tables' fingerprints are {found}, expected {expected}"
+    return None
+
+
+def check_games(count, rng):
+    """Returns what the evaluators disagree on over count random games, or None"""
+    for index in range(count):
+        rows, cols, connect = rng.choice(SIZES)
+        evs = rng.choice(ALL_EV_SETS)
+        player = rng.choice((1, 2))
+        engine = Engine(player, evs, rows, cols, connect, tt_bytes=1024)
+        position = Position(rows, cols, connect)
+        evaluator = engine.sync(position)
+        batch = BatchEvaluator(rows, cols, pattern_table(player, evs, cols, connect), player, 3 - player, connect)
+        positions = []
+        mover = 1
+        while not position.is_full() and not position.is_winner(1) and not position.is_winner(2):
+            evaluator.play(rng.choice([col for col in range(cols) if position.can_play(col)]), mover)
+            mover = 3 - mover
+            if rng.random() < 0.2:
+                evaluator.undo()
+                mover = 3 - mover
+            expected = evaluate_board(position, player, evs)
+            if engine.evaluate_leaf(position) != expected:
+                moves = "".join(str(col + 1) for col, _ in position.moves)
+                return (f"game {index} ({moves}, {game.ev_label(evs)}, player {player}): "
+                        f"incremental score {engine.evaluate_leaf(position)}, evaluate_board {expected}")
+            positions.append(position.copy())
+        scores = batch.evaluate_positions(positions)
+        for board, score in zip(positions, scores):
+            expected = evaluate_board(board, player, evs)
+            if score != expected:
+                moves = "".join(str(col + 1) for col, _ in board.moves)
+                return f"game {index} ({moves}, {game.ev_label(evs)}, player {player}): batch score {score}, evaluate_board {expected}"
+    return None
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="Check that the evaluators agree and the EV scores are unchanged")
+    parser.add_argument("--games", type=int, default=300, help="Random games whose every position is scored every way")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the random games")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    problem = check_tables() or check_games(args.games, random.Random(args.seed))
+    if problem is not None:
+        print(problem)
+        sys.exit(1)
+    print(f"pattern tables match the EV rules for {len(ALL_EV_SETS)} EV sets and {len(SIZES)} board sizes; "
+          f"evaluators agree on {args.games} random games")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Checks the endgame solver against a plain game-tree search.
+
+Random positions with a few empty cells are played out completely by a
+brute-force negamax with no table, no move ordering and no alpha-beta, and
+the solver has to find the same win, draw or loss, pick a move worth that
+much and leave the position as it found it. Each position is solved with
+either player to move, and one solver does every solve, the way an engine
+keeps its solver from game to game, so values it remembers from one side
+or one position must not leak into another:
+
+    python check_solver.py
+    python check_solver.py --positions 500 --empty 10
+
+Exits with status 1 on the first disagreement.
+"""
+import argparse
+import random
+import sys
+
+import game
+from engine import Position, Solver
+from engine.solver import DRAW, LOSS, WIN
+
+NAMES = {WIN: "win", DRAW: "draw", LOSS: "loss"}
+
+
+def brute_force(position, player):
+    """Returns WIN, DRAW or LOSS for player, who is to move, by trying every line of play"""
+    if position.is_full():
+        return DRAW
+    columns = [col for col in range(position.cols) if position.can_play(col)]
+    if any(position.is_winning_move(col, player) for col in columns):
+        return WIN
+    best = LOSS
+    for col in columns:
+        position.play(col, player)
+        value = DRAW if position.is_full() else -brute_force(position, 3 - player)
+        position.undo()
+        best = max(best, value)
+    return best
+
+
+def random_position(empty, rng):
+    """Returns a position with empty cells left where nobody has won yet, and the player to move"""
+    while True:
+        position = Position(game.ROWS, game.COLS, game.CONNECT)
+        player = game.PLAYER
+        while position.rows * position.cols - len(position.moves) > empty:
+            columns = [col for col in range(position.cols)
+                       if position.can_play(col) and not position.is_winning_move(col, player)]
+            if not columns:
+                break
+            position.play(rng.choice(columns), player)
+            player = 3 - player
+        else:
+            return position, player
+
+
+def check(solver, position, player):
+    """Returns what solver got wrong on position with player to move, or None"""
+    moves = list(position.moves)
+    expected = brute_force(position, player)
+    value = solver.solve(position, player)
+    if value != expected:
+        return f"solve says {NAMES[value]}, it is a {NAMES[expected]}"
+    col, value = solver.best_move(position, player)
+    if value != expected:
+        return f"best_move says {NAMES[value]}, it is a {NAMES[expected]}"
+    if position.moves != moves:
+        return "the solver did not restore the position"
+    position.play(col, player)
+    if position.is_winner(player):
+        value = WIN
+    else:
+        value = DRAW if position.is_full() else -brute_force(position, 3 - player)
+    position.undo()
+    if value != expected:
+        return f"best_move plays column {col + 1}, which is a {NAMES[value]}, not a {NAMES[expected]}"
+    return None
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="Check the endgame solver against a brute-force search")
+    parser.add_argument("--positions", type=int, default=100, help="Random positions to check")
+    parser.add_argument("--empty", type=int, default=12, help="Empty cells in each position (brute force time grows fast with it)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the random positions")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    solver = Solver(game.COLS)
+    for index in range(args.positions):
+        position, player = random_position(args.empty, rng)
+        for to_move in (player, 3 - player):
+            problem = check(solver, position, to_move)
+            if problem is not None:
+                moves = "".join(str(col + 1) for col, _ in position.moves)
+                print(f"position {index} ({moves}, player {to_move} to move): {problem}")
+                sys.exit(1)
+    print(f"{args.positions} positions with {args.empty} empty cells: the solver agrees with brute force")
+
+
+if __name__ == "__main__":
+    main()
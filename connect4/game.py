@@ -1,7 +1,13 @@
-import numpy as np
-import random
+import os
+import sys
 import argparse
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from engine import Engine, OpeningBook, Position, evaluation
+from engine.evaluation import NO_EVS
+from engine.ordering import HEURISTICS
+from engine.profiling import MoveProfiler
+
 
 # Constants for the game
 EMPTY = 0
@@ -10,9 +16,35 @@ COMPUTER = 2
 ROWS = 6        #this value could be customized
 COLS = 7        #this value could be customized
 CONNECT = 4     #this value could be customized
+SEARCH_DEPTH = 3    #how many plies minimax looks ahead after each root move
+TT_SIZE_MB = 64     #memory cap of each transposition table
+MOVE_TIME = None    #seconds the AI may think per move, None for no limit
+MAX_NODES = None    #minimax nodes the AI may visit per move, None for no limit
+ORDERING = HEURISTICS   #move ordering heuristics used by minimax
+SHOW_STATS = False  #print search statistics when the game ends
+SEARCH_STATS = False    #collect detailed statistics of every search and print them after each AI move
+BOOK_FILE = None    #opening book made by build_book.py, None to always search
+SOLVE_EMPTY = None  #solve positions exactly with this many empty cells or fewer, None to never solve
+
+# Evaluation functions the customized AI uses, set from the command line
+EV1set = False
+EV2set = False
+EV3set = False
+EV4set = False
+EV5set = False
+EV6set = False
 
 # Initialize the game board
-board = np.zeros((ROWS, COLS), dtype=int)
+board = Position(ROWS, COLS, CONNECT)
+
+# Search engines, one per side and evaluation mode since their scores differ
+engines = {}
+
+# The opening book, mapped the first time an engine is built
+opening_book = None
+
+# Profiles every AI move when --profile is given
+profiler = None
 
 
 # Function to parse command-line arguments
@@ -25,6 +57,16 @@ def parse_args():
     parser.add_argument("--ev5", action="store_true", help="Enable Evaluation Function 5")
     parser.add_argument("--ev6", action="store_true", help="Enable Evaluation Function 6")
     parser.add_argument("--mode", type=int, choices=[0, 1], default=0, help="Game mode (0: AI vs AI, 1: Player vs AI)")
+    parser.add_argument("--depth", type=int, default=SEARCH_DEPTH, help="Search depth of the minimax below each root move")
+    parser.add_argument("--tt-size", type=int, default=TT_SIZE_MB, help="Memory cap in MB of each transposition table")
+    parser.add_argument("--move-time", type=float, default=MOVE_TIME, help="Seconds the AI may think per move (searches deeper until it runs out)")
+    parser.add_argument("--nodes", type=int, default=MAX_NODES, help="Minimax nodes the AI may visit per move (searches deeper until it runs out)")
+    parser.add_argument("--ordering", default=",".join(ORDERING), help="Comma separated move ordering heuristics (" + ", ".join(HEURISTICS) + ") or 'none'")
+    parser.add_argument("--stats", action="store_true", help="Print search statistics when the game ends")
+    parser.add_argument("--search-stats", action="store_true", help="Print node, cutoff and timing statistics of the search after each AI move")
+    parser.add_argument("--solve", type=int, default=SOLVE_EMPTY, help="Play perfectly once this many cells or fewer are empty")
+    parser.add_argument("--profile", metavar="DIR", help="Profile every AI move with cProfile and write the profiles and a report to DIR")
+    parser.add_argument("--book", default=BOOK_FILE, help="Opening book file made by build_book.py, used by the AI whose EVs it was built for")
     
     return parser.parse_args()
 
@@ -53,8 +95,9 @@ player_wins, computer_wins, draws = load_win_counts()
 
 def print_board(board):
     print("")
-    for row in board:
-        print(' '.join(['O' if cell == PLAYER else 'X' if cell == COMPUTER else '.' for cell in row]))
+    for row in range(ROWS):
+        cells = [board.cell(row, col) for col in range(COLS)]
+        print(' '.join(['O' if cell == PLAYER else 'X' if cell == COMPUTER else '.' for cell in cells]))
     board_number = "1"
     for x in range(2, COLS + 1):
         board_number = board_number + " " + str(x)
@@ -62,40 +105,22 @@ def print_board(board):
     #print('1 2 3 4 5 6 7')
 
 def is_valid_move(board, col):
-    return board[0][col] == EMPTY
+    return board.can_play(col)
 
 def make_move(board, col, player):
-    for row in range(ROWS - 1, -1, -1):
-        if board[row][col] == EMPTY:
-            board[row][col] = player
-            break
+    board.play(col, player)
 
 def check_winner(board, player):
-    for row in range(ROWS):
-        for col in range(COLS):
-            if board[row][col] == player:
-                # Check horizontally
-                if col + CONNECT <= COLS and all(board[row][col+i] == player for i in range(CONNECT)):
-                    return True
-                # Check vertically
-                if row + CONNECT <= ROWS and all(board[row+i][col] == player for i in range(CONNECT)):
-                    return True
-                # Check diagonally (positive slope)
-                if col + CONNECT <= COLS and row + CONNECT <= ROWS and all(board[row+i][col+i] == player for i in range(CONNECT)):
-                    return True
-                # Check diagonally (negative slope)
-                if col - CONNECT + 1 >= 0 and row + CONNECT <= ROWS and all(board[row+i][col-i] == player for i in range(CONNECT)):
-                    return True
-    return False
+    return board.is_winner(player)
 
 def is_full(board):
-    return all(cell != EMPTY for cell in board[0])
+    return board.is_full()
 
 def get_player_move():
     # Use the minimax algorithm with Alpha-Beta pruning to make the computer's move.
     if gameMode == 0:
         #print("AI vs AI mode")
-        return get_computer_move(board, False)
+        return get_computer_move(board, False, PLAYER)
     else:
         #print("Player vs AI mode")
         while True:
@@ -110,199 +135,74 @@ def get_player_move():
 
 
 
-def get_computer_move(board, EVon):
+def ev_flags(EFmode):
+    # The EV1-EV6 flags an evaluation mode uses. EFmode is True for the flags set on
+    # the command line, False for none, or the 6 flags themselves.
+    if type(EFmode) is tuple:
+        return EFmode
+    if EFmode is True:
+        return (EV1set, EV2set, EV3set, EV4set, EV5set, EV6set)
+    if not EFmode:
+        return NO_EVS
+    return tuple(EFmode)
+
+def ev_label(EFmode):
+    # Short name of an evaluation mode, like "EV1+EV5" or "default"
+    return evaluation.ev_label(ev_flags(EFmode))
+
+def load_book():
+    # The opening book in BOOK_FILE, or None without one
+    global opening_book
+    if BOOK_FILE is not None and opening_book is None:
+        opening_book = OpeningBook(BOOK_FILE)
+    return opening_book
+
+def get_engine(EFmode, player=COMPUTER):
+    # Search engine of the AI playing player's disks with this evaluation mode, built
+    # with the current settings
+    flags = ev_flags(EFmode)
+    key = (player, flags)
+    if key not in engines:
+        book = load_book()
+        if book is not None and not book.matches(ROWS, COLS, CONNECT, flags):
+            book = None # the book was searched with other EVs
+        engines[key] = Engine(player, flags, ROWS, COLS, CONNECT, depth=SEARCH_DEPTH,
+                              move_time=MOVE_TIME, max_nodes=MAX_NODES, ordering=ORDERING,
+                              tt_bytes=TT_SIZE_MB * 1024 * 1024, book=book, solve_empty=SOLVE_EMPTY,
+                              collect_stats=SEARCH_STATS)
+    return engines[key]
+
+def reset_search():
+    # Forget every engine and its tables, so the next game starts from scratch
+    engines.clear()
+
+def get_batch_evaluator(EFmode):
+    # Scores an (N, ROWS, COLS) stack of boards at once, same scores as evaluate_board
+    return get_engine(EFmode).batch_evaluator()
+
+def get_computer_move(board, EVon, player=COMPUTER):
     # Use the minimax algorithm with Alpha-Beta pruning to make the computer's move.
-    #columns = list(range(COLS))
-    columns = [col for col in range(COLS) if is_valid_move(board, col)]
-    random.shuffle(columns)
-    best_score = -float('inf')
-    best_move = None
-    #for col in range(COLS):
-    for col in columns:
-        if is_valid_move(board, col):
-            board_copy = board.copy()
-            make_move(board_copy, col, COMPUTER)
-            d = random.randint(3, 3)  # Randomly select a depth between 2 and 4
-            score = minimax(board_copy, d, False, -float('inf'), float('inf'), EVon)  # Depth can be adjusted.
-
-            if score > best_score:
-                best_score = score
-                best_move = col
-    return best_move
+    # Positions in the opening book are answered from it first, and with SOLVE_EMPTY
+    # set the endgame is solved exactly when that fits in the solver's node budget.
+    # Without a budget every root move gets a SEARCH_DEPTH search. With MOVE_TIME or
+    # MAX_NODES set, the search goes one ply deeper at a time until the budget runs
+    # out and the best move of the last finished depth is played. player is the side
+    # to move, the computer unless the AI plays the player's disks in AI vs AI mode.
+    if profiler is not None:
+        return profiler.run(get_engine(EVon, player).get_move, board)
+    return get_engine(EVon, player).get_move(board)
 
 def minimax(board, depth, is_maximizing, alpha, beta, EFmode):
-    #print(EFmode)
-    if depth == 0 or check_winner(board, PLAYER) or check_winner(board, COMPUTER) or is_full(board):
-        return evaluate_board(board, EFmode)
-
-    if is_maximizing:
-        max_eval = -float('inf')
-        for col in range(COLS):
-            if is_valid_move(board, col):
-                board_copy = board.copy()
-                make_move(board_copy, col, COMPUTER)
-                eval = minimax(board_copy, depth - 1, False, alpha, beta, EFmode)
-                max_eval = max(max_eval, eval)
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    break
-        return max_eval
-    else:
-        min_eval = float('inf')
-        for col in range(COLS):
-            if is_valid_move(board, col):
-                board_copy = board.copy()
-                make_move(board_copy, col, PLAYER)
-                eval = minimax(board_copy, depth - 1, True, alpha, beta, EFmode)
-                min_eval = min(min_eval, eval)
-                beta = min(beta, eval)
-                if beta <= alpha:
-                    break
-        return min_eval
+    # Alpha-beta value of board for the computer
+    ai = get_engine(EFmode)
+    ai.sync(board)
+    return ai.minimax(board, depth, is_maximizing, alpha, beta)
 
 def evaluate_board(board, EFmode):
-    #if evalFuncMode == 0:
-        #print("using strategy 0: no traps")
-        score = 0
-
-        # Evaluate based on winning positions
-        if check_winner(board, COMPUTER):
-            score += 100
-        elif check_winner(board, PLAYER):
-            score -= 100
-
-        # Evaluate based on the number of computer's pieces in rows, columns, and diagonals
-        for row in range(ROWS):
-            for col in range(COLS - 3):
-                window = [board[row][col + i] for i in range(4)]
-                score += evaluate_window(window, COMPUTER, EFmode)
-
-        for col in range(COLS):
-            for row in range(ROWS - 3):
-                window = [board[row + i][col] for i in range(4)]
-                score += evaluate_window(window, COMPUTER, EFmode)
-
-        for row in range(ROWS - 3):
-            for col in range(COLS - 3):
-                window = [board[row + i][col + i] for i in range(4)]
-                score += evaluate_window(window, COMPUTER, EFmode)
-
-        for row in range(ROWS - 3):
-            for col in range(COLS - 3):
-                window = [board[row + 3 - i][col + i] for i in range(4)]
-                score += evaluate_window(window, COMPUTER, EFmode)
-
-        return score
-
+    return evaluation.evaluate_board(board, COMPUTER, ev_flags(EFmode))
 
 def evaluate_window(window, player, EFmode):
-    score = 0
-    opponent = PLAYER if player == COMPUTER else COMPUTER
-
-
-    if window.count(player) == 4:
-        score += 100
-    elif window.count(player) == 3 and window.count(EMPTY) == 1:
-        score += 5
-    elif window.count(player) == 2 and window.count(EMPTY) == 2:
-        score += 2
-
-    if window.count(opponent) == 3 and window.count(EMPTY) == 1:
-        score -= 4
-
-    #only AI2 will run customized EFs
-    if EFmode and EV1set:
-        # print("using strategy 1: trying to conquer the center")
-        # Conquer the center strategy: Assign higher scores to positions closer to the center - ATK
-        center_col = COLS // 2
-        for i in range(4):
-            if window[i] == player:
-                score += abs(center_col - (i + 1))  # Adjust the weight as needed
-    
-    if EFmode and EV2set:
-        # print("using strategy 2: building a 7 trap.")
-        # 7-trap strategy - ATK
-        # Focuses on a particular 4-piece configuration with one player's piece at each end.
-        # It looks for a configuration where there is one piece of the current player (player), three empty spaces (EMPTY), and the player's pieces are at both ends of the configuration (window[0] and window[3]).
-        if window.count(player) == 1 and window.count(EMPTY) == 3:
-            # Check for a "7-trap" pattern: [X, ., ., O] or [O, ., ., X]
-            if window[0] == player and window[3] == player:
-                score += 10
-    
-    if EFmode and EV3set:
-        # print("using strategy 3: evaluating surrounding discs.")
-        # Evaluate surrounding discs: Check left, right, up, down, and both diagonals - ATK
-        for i in range(4):
-            # Check left
-            if i > 0 and window[i - 1] == player:
-                score += 1
-            # Check right
-            if i < 3 and window[i + 1] == player:
-                score += 1
-            # Check up
-            if window[i] == player and i < 2 and window[i + 2] == player:
-                score += 1
-            # Check down
-            if window[i] == player and i > 1 and window[i - 2] == player:
-                score += 1
-            # Check both diagonals
-            if i % 2 == 0 and window[i] == player and window[(i + 2) % 4] == player:
-                score += 1
-
-    if EFmode and EV4set:
-        # print("using strategy 4: block opponent's trap.")
-        # Evaluate blocking opponent's trap - DEFENSIVE
-        for i in range(2):
-            if window[i] == opponent and window[i + 2] == opponent and window[i + 1] == EMPTY and window[(i + 3) % 4] == EMPTY:
-                score -= 8
-
-    if EFmode and EV5set:
-        # Check for forks
-        # print("using strategy 5: fork10.")
-        empty_count = window.count(EMPTY)
-        player_count = window.count(player)
-        opponent_count = window.count(opponent)
-
-        # Check for horizontal fork
-        if empty_count == 2 and player_count == 2 and opponent_count == 1:
-            score += 5
-
-        # Check for vertical fork
-        if empty_count == 3 and player_count == 1 and opponent_count == 2:
-            score += 5
-
-        # Check for diagonal (positive slope) fork
-        if empty_count == 2 and player_count == 2 and opponent_count == 1:
-            score += 5
-
-        # Check for diagonal (negative slope) fork
-        if empty_count == 3 and player_count == 1 and opponent_count == 2:
-            score += 5
-
-    if EFmode and EV6set:
-        # Check for forks
-        # print("using strategy 6: fork25.")
-
-        empty_count = window.count(EMPTY)
-        player_count = window.count(player)
-        opponent_count = window.count(opponent)
-
-        # Check for horizontal fork
-        if empty_count == 2 and player_count == 2 and opponent_count == 1:
-            score += 10
-
-        # Check for vertical fork
-        if empty_count == 3 and player_count == 1 and opponent_count == 2:
-            score += 5
-
-        # Check for diagonal (positive slope) fork
-        if empty_count == 2 and player_count == 2 and opponent_count == 1:
-            score += 10
-
-        # Check for diagonal (negative slope) fork
-        if empty_count == 3 and player_count == 1 and opponent_count == 2:
-            score += 5
-    return score
+    return evaluation.evaluate_window(window, player, ev_flags(EFmode), COLS)
 
 def main():
     print("Welcome to Connect Four!")
@@ -321,6 +221,16 @@ def main():
     global EV5set
     global EV6set
     global gameMode
+    global SEARCH_DEPTH
+    global TT_SIZE_MB
+    global MOVE_TIME
+    global MAX_NODES
+    global ORDERING
+    global SHOW_STATS
+    global SEARCH_STATS
+    global profiler
+    global BOOK_FILE
+    global SOLVE_EMPTY
     #EV1set = False
     #EV2set = False
     #EV3set = False
@@ -340,6 +250,17 @@ def main():
     EV5set = args.ev5
     EV6set = args.ev6
     gameMode = args.mode
+    SEARCH_DEPTH = args.depth
+    TT_SIZE_MB = args.tt_size
+    MOVE_TIME = args.move_time
+    MAX_NODES = args.nodes
+    ORDERING = [] if args.ordering == "none" else args.ordering.split(",")
+    SHOW_STATS = args.stats
+    SEARCH_STATS = args.search_stats
+    if args.profile:
+        profiler = MoveProfiler(args.profile)
+    BOOK_FILE = args.book
+    SOLVE_EMPTY = args.solve
 
     # print("config: ", EV1set, EV2set, EV3set, EV4set, EV5set, EV6set, gameMode)
 
@@ -352,6 +273,8 @@ def main():
             make_move(board, col, PLAYER)
             if gameMode == 1:
                 print('Player movement: ' + str(col+1))
+            elif SEARCH_STATS:
+                print_move_stats(False, PLAYER)
             if check_winner(board, PLAYER):
                 print_board(board)
                 if gameMode == 1:
@@ -367,6 +290,8 @@ def main():
             make_move(board, col, COMPUTER)
             if gameMode == 1:
                 print('AI movement: ' + str(col+1))
+            if SEARCH_STATS:
+                print_move_stats(True)
             if check_winner(board, COMPUTER):
                 print_board(board)
                 if gameMode == 1:
@@ -393,6 +318,39 @@ def main():
         print('score: Player: ' + str(player_wins) + '\tAI: ' + str(computer_wins) + '\tDraws: ' + str(draws))
     else:
         print('score: AI(default): ' + str(player_wins) + '\tAI(customized): ' + str(computer_wins) + '\tDraws: ' + str(draws))
+    if SHOW_STATS:
+        print_stats()
+    if profiler is not None:
+        print('profile report: ' + str(profiler.end_game()))
+
+def ai_name(EFmode, player):
+    # Name of the AI playing player's disks with this evaluation mode, like "AI2(EV1+EV5)"
+    return "AI" + str(player) + "(" + ev_label(EFmode) + ")"
+
+def print_move_stats(EFmode, player=COMPUTER):
+    # Print what the search behind this AI's last move did
+    stats = get_engine(EFmode, player).search_stats
+    name = ai_name(EFmode, player)
+    print(name + ' ' + stats.source + ' move ' + ' '.join(str(col + 1) for col in stats.pv[:1]) + ': depth ' + str(stats.depth)
+          + ', ' + str(stats.nodes) + ' nodes in ' + f'{stats.seconds * 1000:.1f}' + 'ms, score ' + str(stats.score))
+    if stats.source != "search":
+        return
+    print('  principal variation: ' + ' '.join(str(col + 1) for col in stats.pv))
+    print('  nodes by ply: ' + str(stats.nodes_by_ply[1:]) + ', branching factor ' + f'{stats.branching_factor:.2f}'
+          + ', leaf evaluations ' + str(stats.leaf_evaluations))
+    print('  cutoffs by move index: ' + str(stats.cutoffs_by_index) + ', re-searches ' + str(stats.re_searches)
+          + ', TT hits ' + str(stats.tt_hits) + '/' + str(stats.tt_probes))
+    print('  root moves: ' + ', '.join(str(col + 1) + ' = ' + str(move["score"]) + ' (' + str(move["nodes"]) + ' nodes, '
+                                       + f'{move["seconds"] * 1000:.1f}' + 'ms)' for col, move in sorted(stats.root_moves.items())))
+
+def print_stats():
+    # Print the move ordering and transposition table counters of each AI
+    for player, EFmode in sorted(engines):
+        name = ai_name(EFmode, player)
+        engine = engines[player, EFmode]
+        print(name + ' ordering: ' + str(engine.orderer.stats()))
+        print(name + ' transposition table: ' + str(engine.table.stats()))
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,168 @@
+"""Plays many AI vs AI games across all cores and writes the results once.
+
+Replaces launching ``game.py`` once per game: each worker process imports
+NumPy and the engine a single time and nothing is written until every game
+is over. The first AI plays PLAYER and moves first, the second plays
+COMPUTER, exactly like ``game.py --mode 0``; each scores positions for its
+own disks and has its own search tables, even with the same EVs. Game i of a matchup is seeded
+with ``seed + i`` and starts with empty search tables, so the totals are the
+same no matter how many workers play them or in which order they finish.
+
+    python tournament.py --games 1000 --ai2 1,5 --output win_counts15.json
+    python tournament.py --games 1000 --every-ev --output every_ev.json
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import game
+
+
+def parse_evs(text):
+    """Turns "1,5" into the EV1-EV6 flags with EV1 and EV5 on"""
+    enabled = {int(number) for number in text.split(",") if number.strip()}
+    for number in enabled:
+        if not 1 <= number <= 6:
+            raise argparse.ArgumentTypeError(f"there is no EV{number}")
+    return tuple(number in enabled for number in range(1, 7))
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="Play a batch of Connect Four games between two AIs")
+    parser.add_argument("--games", type=int, default=100, help="Number of games to play")
+    parser.add_argument("--ai1", type=parse_evs, default=game.NO_EVS, help="EVs of the first AI, like 1,5 (default: none)")
+    parser.add_argument("--ai2", type=parse_evs, default=game.NO_EVS, help="EVs of the second AI, like 1,5 (default: none)")
+    parser.add_argument("--every-ev", action="store_true", help="Play the first AI against every combination of EVs instead of --ai2")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game, game i uses seed + i")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (1 plays every game in this process)")
+    parser.add_argument("--depth", type=int, default=game.SEARCH_DEPTH, help="Search depth of the minimax below each root move")
+    parser.add_argument("--move-time", type=float, default=None, help="Seconds each AI may think per move")
+    parser.add_argument("--nodes", type=int, default=None, help="Minimax nodes each AI may visit per move")
+    parser.add_argument("--search-stats", action="store_true", help="Log node, cutoff and timing statistics of every search with each game")
+    parser.add_argument("--solve", type=int, default=None, help="Each AI plays perfectly once this many cells or fewer are empty")
+    parser.add_argument("--book", default=None, help="Opening book file made by build_book.py")
+    parser.add_argument("--output", default="tournament_results.json", help="File the results are written to")
+    return parser.parse_args()
+
+
+def init_worker(depth, move_time, nodes, book=None, solve=None, search_stats=False):
+    """Copies the search settings into a worker process"""
+    game.SEARCH_DEPTH = depth
+    game.MOVE_TIME = move_time
+    game.MAX_NODES = nodes
+    game.BOOK_FILE = book
+    game.SOLVE_EMPTY = solve
+    game.SEARCH_STATS = search_stats
+
+
+def play_game(ai1, ai2, seed):
+    """Plays one game and returns its result as a dict"""
+    random.seed(seed)
+    # every game starts with empty tables so it plays the same wherever it runs
+    game.reset_search()
+    board = game.Position(game.ROWS, game.COLS, game.CONNECT)
+    move_times = []
+    searches = [] # stats of every search, when they are collected
+    winner = "draw"
+    player_turn = True
+    start = time.perf_counter()
+    while True:
+        piece, evs = (game.PLAYER, ai1) if player_turn else (game.COMPUTER, ai2)
+        move_start = time.perf_counter()
+        col = game.get_computer_move(board, evs, piece)
+        move_times.append(time.perf_counter() - move_start)
+        if game.SEARCH_STATS:
+            searches.append(dict(game.get_engine(evs, piece).search_stats.as_dict(), ai="ai1" if player_turn else "ai2"))
+        game.make_move(board, col, piece)
+        if game.check_winner(board, piece):
+            winner = "ai1" if player_turn else "ai2"
+            break
+        if game.is_full(board):
+            break
+        player_turn = not player_turn
+    result = {
+        "ai2": game.ev_label(ai2),
+        "seed": seed,
+        "winner": winner,
+        "moves": len(board.moves),
+        "seconds": round(time.perf_counter() - start, 4),
+        "max_move_seconds": round(max(move_times), 4),
+    }
+    if game.SEARCH_STATS:
+        result["searches"] = searches
+    return result
+
+
+def summarize(ai1, ai2, games):
+    """Returns the win/loss/draw totals and timings of a list of game results"""
+    seconds = sum(result["seconds"] for result in games)
+    moves = sum(result["moves"] for result in games)
+    return {
+        "ai1": game.ev_label(ai1),
+        "ai2": game.ev_label(ai2),
+        "games": len(games),
+        "ai1_wins": sum(result["winner"] == "ai1" for result in games),
+        "ai2_wins": sum(result["winner"] == "ai2" for result in games),
+        "draws": sum(result["winner"] == "draw" for result in games),
+        "average_moves": round(moves / len(games), 2) if games else 0,
+        "seconds": round(seconds, 2),
+        "seconds_per_move": round(seconds / moves, 4) if moves else 0,
+    }
+
+
+def play_games(tasks, workers, settings):
+    """Plays (ai1, ai2, seed) tasks and returns the results in task order
+
+    Results stream back as games finish and progress is printed as they do.
+    """
+    results = [None] * len(tasks)
+    step = max(1, len(tasks) // 20)
+    if workers <= 1:
+        init_worker(*settings)
+        for index, task in enumerate(tasks):
+            results[index] = play_game(*task)
+            if (index + 1) % step == 0:
+                print(f"{index + 1}/{len(tasks)} games played", flush=True)
+        return results
+
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=settings) as pool:
+        futures = {pool.submit(play_game, *task): index for index, task in enumerate(tasks)}
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            if done % step == 0:
+                print(f"{done}/{len(tasks)} games played", flush=True)
+    return results
+
+
+def main():
+    args = parse_args()
+    if args.every_ev:
+        matchups = [flags for flags in itertools.product((False, True), repeat=6) if any(flags)]
+    else:
+        matchups = [args.ai2]
+    tasks = [(args.ai1, ai2, args.seed + i) for ai2 in matchups for i in range(args.games)]
+
+    start = time.perf_counter()
+    games = play_games(tasks, args.workers, (args.depth, args.move_time, args.nodes, args.book, args.solve, args.search_stats))
+    wall = time.perf_counter() - start
+
+    summaries = []
+    for index, ai2 in enumerate(matchups):
+        summary = summarize(args.ai1, ai2, games[index * args.games:(index + 1) * args.games])
+        summaries.append(summary)
+        print('score: AI1(' + summary["ai1"] + '): ' + str(summary["ai1_wins"]) + '\tAI2(' + summary["ai2"] + '): ' + str(summary["ai2_wins"]) + '\tDraws: ' + str(summary["draws"]))
+
+    with open(args.output, "w") as file:
+        results = {"summary": summaries[0], "games": games} if len(summaries) == 1 else {"summaries": summaries, "games": games}
+        json.dump(results, file, indent=1)
+    moves = sum(result["moves"] for result in games)
+    print(f'{len(games)} games in {wall:.2f}s on {args.workers} worker(s), {moves / wall:.1f} moves per second')
+
+
+if __name__ == "__main__":
+    main()
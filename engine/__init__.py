@@ -0,0 +1,12 @@
+"""UI-free Connect 4 engine shared by the text and pygame front ends."""
+
+from .bitboard import Position
+from .transposition import TranspositionTable
+from .ordering import MoveOrderer
+from .incremental import IncrementalEvaluator
+from .batch import BatchEvaluator
+from .book import OpeningBook, build_book, write_book
+from .lines import LineTable, line_table
+from .evaluation import NO_EVS, ev_label, evaluate_board, evaluate_window, pattern_table
+from .solver import Solver
+from .search import Engine, SearchCancelled, SearchStats, SearchTimeout
@@ -0,0 +1,85 @@
+"""Vectorized NumPy scoring of many positions at once."""
+
+import numpy as np
+
+from .lines import line_table
+
+
+class BatchEvaluator:
+    """Scores a stack of boards with a few array operations
+
+    Boards are int arrays shaped ``(N, rows, cols)`` with row 0 on top and
+    cells holding 0 (empty) or a player id, the same layout the text UI
+    prints. The windows are the board's ``connect``-long lines and ``table``
+    holds the score of each of their ``3 ** connect`` possible contents by
+    base-3 code (see ``evaluation.pattern_table``), so a board's score is a
+    code per window and a table lookup, plus +/-100 when ``player`` or ``opponent``
+    has a whole line, which is what evaluate_board computes.
+    """
+    def __init__(self, rows, cols, table, player=2, opponent=1, connect=4):
+        """Precompute the window index arrays"""
+        self._rows = rows
+        self._cols = cols
+        self._player = player
+        self._opponent = opponent
+        # flat cell index of every cell in every window, shaped (windows, connect)
+        self._windows = np.array(line_table(rows, cols, connect).flat, dtype=np.intp).reshape(-1, connect)
+        self._place_values = 3 ** np.arange(connect)
+        # score of each window content, indexed by its base-3 code
+        self._table = np.array(table, dtype=np.int64)
+
+    def evaluate(self, boards):
+        """Returns the score of every board in an (N, rows, cols) stack"""
+        boards = np.asarray(boards).reshape(-1, self._rows * self._cols)
+        windows = boards[:, self._windows]
+        codes = windows @ self._place_values
+        scores = self._table[codes].sum(axis=1)
+        wins = (windows == self._player).all(axis=2).any(axis=1)
+        losses = (windows == self._opponent).all(axis=2).any(axis=1)
+        return scores + np.where(wins, 100, np.where(losses, -100, 0))
+
+    def evaluate_positions(self, positions):
+        """Returns the score of every engine Position in a list"""
+        return self.evaluate(stack_positions(positions))
+
+
+def stack_positions(positions):
+    """Returns engine Positions as an (N, rows, cols) array, row 0 on top"""
+    if not positions:
+        return np.zeros((0, 0, 0), dtype=np.int8)
+    rows, cols = positions[0].rows, positions[0].cols
+    boards = np.zeros((len(positions), rows, cols), dtype=np.int8)
+    for index, position in enumerate(positions):
+        for player in (1, 2):
+            mask = position.masks[player]
+            for col in range(cols):
+                for height in range(position.height(col)):
+                    if mask >> (col * (rows + 1) + height) & 1:
+                        boards[index, rows - 1 - height, col] = player
+    return boards
+
+
+def frontier(position, depth, player):
+    """Returns every line of play ``depth`` plies deep and the boards it reaches
+
+    ``player`` moves first and the players alternate. Lines stop early at a
+    win or a full board. The result is a list of column sequences and the
+    matching (N, rows, cols) stack, ready for ``BatchEvaluator.evaluate``.
+    """
+    lines = []
+    leaves = []
+
+    def expand(depth, player):
+        if depth == 0 or position.is_winner(1) or position.is_winner(2) or position.is_full():
+            lines.append([col for col, _ in position.moves[start:]])
+            leaves.append(position.copy())
+            return
+        for col in range(position.cols):
+            if position.can_play(col):
+                position.play(col, player)
+                expand(depth - 1, 3 - player)
+                position.undo()
+
+    start = len(position.moves)
+    expand(depth, player)
+    return lines, stack_positions(leaves)
@@ -0,0 +1,99 @@
+"""Bitboard representation of a Connect 4 position."""
+
+from .lines import line_table
+from .transposition import zobrist_keys
+
+
+class Position:
+    """A Connect 4 position stored as one bitmask per player.
+
+    Players are identified by the ints 1 and 2 and an empty cell is 0, the
+    same values the text UI keeps in its grid. Each column takes
+    ``rows + 1`` bits: bit ``col * (rows + 1) + r`` is the cell ``r`` rows up
+    from the bottom of ``col``, and the extra top bit is always 0 so lines
+    can never wrap from one column into the next.
+
+    ``key`` is the Zobrist hash of the disks on the board, kept up to date
+    by ``play`` and ``undo``.
+    """
+    def __init__(self, rows=6, cols=7, connect=4):
+        """Create an empty board."""
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+        self._stride = rows + 1
+        self.masks = [0, 0, 0] # bitmask per player id, slot 0 is unused
+        self.heights = [col * self._stride for col in range(cols)] # next free bit per column
+        self.moves = [] # stack of (col, player) for undo
+        self.key = 0 # Zobrist hash of the disks
+        self._zobrist = zobrist_keys(cols * self._stride)
+        self.lines = line_table(rows, cols, connect)
+        self._tops = [col * self._stride + rows for col in range(cols)] # sentinel bit per column
+        # bit shifts for vertical, horizontal and both diagonal lines
+        self._directions = (1, self._stride, self._stride - 1, self._stride + 1)
+
+    def copy(self):
+        """Returns an independent copy of the position"""
+        other = Position.__new__(Position)
+        other.__dict__.update(self.__dict__)
+        other.masks = self.masks[:]
+        other.heights = self.heights[:]
+        other.moves = self.moves[:]
+        return other
+
+    def can_play(self, col):
+        """Returns True if a disk can be dropped in the column"""
+        return self.heights[col] != self._tops[col]
+
+    def play(self, col, player):
+        """Drops a disk for player in the column"""
+        bit = self.heights[col]
+        self.masks[player] |= 1 << bit
+        self.key ^= self._zobrist[player][bit]
+        self.heights[col] = bit + 1
+        self.moves.append((col, player))
+
+    def undo(self):
+        """Takes back the last move"""
+        col, player = self.moves.pop()
+        bit = self.heights[col] - 1
+        self.heights[col] = bit
+        self.masks[player] ^= 1 << bit
+        self.key ^= self._zobrist[player][bit]
+
+    def height(self, col):
+        """Returns how many disks are in the column"""
+        return self.heights[col] - col * self._stride
+
+    def is_winner(self, player):
+        """Returns True if player has `connect` disks in a row"""
+        board = self.masks[player]
+        for shift in self._directions:
+            line = board
+            for _ in range(self.connect - 1):
+                line &= line >> shift
+            if line:
+                return True
+        return False
+
+    def is_winning_move(self, col, player):
+        """Returns True if player would win by dropping a disk in the column"""
+        bit = self.heights[col]
+        board = self.masks[player] | 1 << bit
+        for mask in self.lines.bit_masks.get(bit, ()):
+            if board & mask == mask:
+                return True
+        return False
+
+    def is_full(self):
+        """Returns True if no more moves can be played"""
+        return len(self.moves) == self.rows * self.cols
+
+    def cell(self, row, col):
+        """Returns the player id in a cell, rows counted from the top"""
+        bit = 1 << (col * self._stride + self.rows - 1 - row)
+        if self.masks[1] & bit:
+            return 1
+        if self.masks[2] & bit:
+            return 2
+        return 0
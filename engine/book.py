@@ -0,0 +1,107 @@
+"""Opening book: best moves of the first plies, searched offline and memory-mapped."""
+
+import mmap
+import struct
+
+from .bitboard import Position
+
+MAGIC = b"C4BK"
+# magic, rows, cols, connect, EV flags as bits, number of entries
+HEADER = struct.Struct("<4sBBBBQ")
+KEY = struct.Struct("<Q")
+
+
+def ev_bits(evs):
+    """Packs the EV1-EV6 flags into an int, EV1 in the lowest bit"""
+    return sum(1 << i for i, on in enumerate(evs) if on)
+
+
+def side_to_move(position):
+    """Returns the player id to move in a game player 1 started, like the ones books are built from"""
+    return 1 if len(position.moves) % 2 == 0 else 2
+
+
+def write_book(path, moves, rows, cols, connect, evs):
+    """Writes a {position key: column} dict as a book file
+
+    The file is the header, then the keys in ascending order as 64-bit
+    little-endian ints, then one byte per key with its column, so a reader
+    can binary-search it in place.
+    """
+    keys = sorted(moves)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, rows, cols, connect, ev_bits(evs), len(keys)))
+        file.write(b"".join(KEY.pack(key) for key in keys))
+        file.write(bytes(moves[key] for key in keys))
+
+
+def build_book(engines, plies, rows=6, cols=7, connect=4, progress=None):
+    """Searches every position of the first plies and returns {position key: column}
+
+    engines maps each player id to the Engine that picks its moves, so each
+    entry holds the move for the side to move. Transpositions are searched
+    once. progress, if given, is called with each position searched.
+    """
+    moves = {}
+    position = Position(rows, cols, connect)
+
+    def visit(ply):
+        if ply == plies or position.key in moves:
+            return
+        player = side_to_move(position)
+        moves[position.key] = engines[player].get_move(position)
+        if progress is not None:
+            progress(position)
+        for col in range(cols):
+            if position.can_play(col):
+                position.play(col, player)
+                if not position.is_winner(player) and not position.is_full():
+                    visit(ply + 1)
+                position.undo()
+
+    visit(0)
+    return moves
+
+
+class OpeningBook:
+    """A book file mapped into memory
+
+    Nothing is parsed up front: move binary-searches the mapped keys, so
+    opening a book costs the same whatever its size, and processes playing
+    with the same book share its pages.
+    """
+    def __init__(self, path):
+        """Map the file and read its header"""
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, self.cols, self.connect, self._evs, self._count = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not an opening book")
+        self._moves_at = HEADER.size + KEY.size * self._count
+
+    def __len__(self):
+        """Returns the number of positions in the book"""
+        return self._count
+
+    def matches(self, rows, cols, connect, evs):
+        """Returns True if the book was built for this board and these EVs"""
+        return (self.rows, self.cols, self.connect, self._evs) == (rows, cols, connect, ev_bits(evs))
+
+    def move(self, key):
+        """Returns the book's column for the position key, or None if it is not in the book"""
+        data = self._map
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if KEY.unpack_from(data, HEADER.size + KEY.size * mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and KEY.unpack_from(data, HEADER.size + KEY.size * lo)[0] == key:
+            return data[self._moves_at + lo]
+        return None
+
+    def close(self):
+        """Unmaps the file"""
+        self._map.close()
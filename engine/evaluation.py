@@ -0,0 +1,185 @@
+"""Window-based evaluation of Connect 4 positions.
+
+Cells hold 0 for empty and the player ids 1 and 2, like ``Position.cell``.
+EV1-EV6 are the optional scoring rules picked in the settings screen or on
+the text UI's command line, passed around as a tuple of six flags.
+"""
+
+import itertools
+
+EMPTY = 0
+NO_EVS = (False,) * 6
+
+_patterns = {}
+
+
+def ev_label(evs):
+    """Returns a short name for a set of EVs, like EV1+EV5 or default"""
+    return "+".join("EV" + str(i + 1) for i, flag in enumerate(evs) if flag) or "default"
+
+
+def evaluate_board(position, player, evs=NO_EVS):
+    """Returns the score of a position for player
+
+    +/-100 if either side has won, plus the score of every window.
+    """
+    score = 0
+
+    # Evaluate based on winning positions
+    if position.is_winner(player):
+        score += 100
+    elif position.is_winner(3 - player):
+        score -= 100
+
+    # Evaluate based on the number of player's pieces in rows, columns, and diagonals
+    table = pattern_table(player, evs, position.cols, position.connect)
+    cell = position.cell
+    for line in position.lines.cells:
+        code = 0
+        for row, col in reversed(line):
+            code = code * 3 + cell(row, col)
+        score += table[code]
+
+    return score
+
+
+def pattern_table(player, evs=NO_EVS, cols=7, connect=4):
+    """Returns the score of every window content for player, indexed by its base-3 code
+
+    Digit ``i`` of a code is the contents of the window's cell ``i``. The
+    3 ** connect patterns are scored once per player, EV set and board
+    width, and the table is shared by every caller after that.
+    """
+    key = (player, tuple(evs), cols, connect)
+    if key not in _patterns:
+        # product counts up with the last cell fastest, so reversed contents come out in code order
+        _patterns[key] = tuple(score_window(contents[::-1], player, evs, cols)
+                               for contents in itertools.product(range(3), repeat=connect))
+    return _patterns[key]
+
+
+def evaluate_window(window, player, evs=NO_EVS, cols=7):
+    """Returns the score of one window of cells for player, from the pattern table
+
+    ``evs`` holds the EV1-EV6 flags and ``cols`` is the board width, which
+    EV1 uses to find the center.
+    """
+    code = 0
+    for value in reversed(window):
+        code = code * 3 + value
+    return pattern_table(player, evs, cols, len(window))[code]
+
+
+def score_window(window, player, evs=NO_EVS, cols=7):
+    """Works out the score of one window of cells for player, rule by rule
+
+    This is what the pattern table holds; everything else looks scores up
+    in the table.
+    """
+    score = 0
+    opponent = 3 - player
+    size = len(window)  # connect cells
+    ev1, ev2, ev3, ev4, ev5, ev6 = evs
+
+    if window.count(player) == size:
+        score += 100
+    elif window.count(player) == size - 1 and window.count(EMPTY) == 1:
+        score += 5
+    elif window.count(player) == size - 2 and window.count(EMPTY) == 2:
+        score += 2
+
+    if window.count(opponent) == size - 1 and window.count(EMPTY) == 1:
+        score -= 4
+
+    if ev1:
+        # print("using strategy 1: trying to conquer the center")
+        # Conquer the center strategy: Assign higher scores to positions closer to the center - ATK
+        center_col = cols // 2
+        for i in range(size):
+            if window[i] == player:
+                score += abs(center_col - (i + 1))  # Adjust the weight as needed
+    
+    if ev2:
+        # print("using strategy 2: building a 7 trap.")
+        # 7-trap strategy - ATK
+        # Focuses on a particular 4-piece configuration with one player's piece at each end.
+        # It looks for a configuration where there is one piece of the current player (player), three empty spaces (EMPTY), and the player's pieces are at both ends of the configuration (window[0] and window[3]).
+        if window.count(player) == 1 and window.count(EMPTY) == size - 1:
+            # Check for a "7-trap" pattern: [X, ., ., O] or [O, ., ., X]
+            if window[0] == player and window[size - 1] == player:
+                score += 10
+    
+    if ev3:
+        # print("using strategy 3: evaluating surrounding discs.")
+        # Evaluate surrounding discs: Check left, right, up, down, and both diagonals - ATK
+        for i in range(size):
+            # Check left
+            if i > 0 and window[i - 1] == player:
+                score += 1
+            # Check right
+            if i < size - 1 and window[i + 1] == player:
+                score += 1
+            # Check up
+            if window[i] == player and i < size - 2 and window[i + 2] == player:
+                score += 1
+            # Check down
+            if window[i] == player and i > 1 and window[i - 2] == player:
+                score += 1
+            # Check both diagonals
+            if i % 2 == 0 and window[i] == player and window[(i + 2) % size] == player:
+                score += 1
+
+    if ev4:
+        # print("using strategy 4: block opponent's trap.")
+        # Evaluate blocking opponent's trap - DEFENSIVE
+        for i in range(size - 2):
+            if window[i] == opponent and window[i + 2] == opponent and window[i + 1] == EMPTY and window[(i + 3) % size] == EMPTY:
+                score -= 8
+
+    if ev5:
+        # Check for forks
+        # print("using strategy 5: fork10.")
+        empty_count = window.count(EMPTY)
+        player_count = window.count(player)
+        opponent_count = window.count(opponent)
+
+        # Check for horizontal fork
+        if empty_count == 2 and player_count == 2 and opponent_count == 1:
+            score += 5
+
+        # Check for vertical fork
+        if empty_count == 3 and player_count == 1 and opponent_count == 2:
+            score += 5
+
+        # Check for diagonal (positive slope) fork
+        if empty_count == 2 and player_count == 2 and opponent_count == 1:
+            score += 5
+
+        # Check for diagonal (negative slope) fork
+        if empty_count == 3 and player_count == 1 and opponent_count == 2:
+            score += 5
+
+    if ev6:
+        # Check for forks
+        # print("using strategy 6: fork25.")
+
+        empty_count = window.count(EMPTY)
+        player_count = window.count(player)
+        opponent_count = window.count(opponent)
+
+        # Check for horizontal fork
+        if empty_count == 2 and player_count == 2 and opponent_count == 1:
+            score += 10
+
+        # Check for vertical fork
+        if empty_count == 3 and player_count == 1 and opponent_count == 2:
+            score += 5
+
+        # Check for diagonal (positive slope) fork
+        if empty_count == 2 and player_count == 2 and opponent_count == 1:
+            score += 10
+
+        # Check for diagonal (negative slope) fork
+        if empty_count == 3 and player_count == 1 and opponent_count == 2:
+            score += 5
+    return score
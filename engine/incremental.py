@@ -0,0 +1,68 @@
+"""Evaluation that keeps per-window scores up to date move by move."""
+
+
+class IncrementalEvaluator:
+    """Keeps the sum of window scores of a position as moves are played
+
+    The windows are the position's lines (see ``engine.lines``), and their
+    contents are kept as a base-3 code (digit ``i`` is the player id in cell
+    ``i``), so a move only touches the windows through the cell it fills,
+    and ``table`` gives the score of each code (see
+    ``evaluation.pattern_table``).
+
+    Moves have to go through ``play`` and ``undo`` to keep the score in sync
+    with the position; call ``reset`` after moving on the position directly.
+    """
+    def __init__(self, position, table):
+        """Index the windows by cell and score the current position"""
+        self.position = position
+        self._windows = position.lines.cells
+        self._table = table # window code -> score
+        # bit index of a cell -> ((window index, base-3 place value), ...)
+        self._cell_windows = {
+            bit: tuple((index, 3 ** place) for index, place in lines)
+            for bit, lines in position.lines.bit_lines.items()
+        }
+        self.reset()
+
+    def reset(self):
+        """Rescore every window from the position's current cells"""
+        cell = self.position.cell
+        table = self._table
+        self._codes = []
+        self._scores = []
+        for window in self._windows:
+            code = 0
+            for place, (row, col) in enumerate(window):
+                code += cell(row, col) * 3 ** place
+            self._codes.append(code)
+            self._scores.append(table[code])
+        self.score = sum(self._scores)
+
+    def play(self, col, player):
+        """Plays a move on the position and rescores its windows"""
+        position = self.position
+        bit = position.heights[col]
+        position.play(col, player)
+        self._update(bit, player)
+
+    def undo(self):
+        """Takes back the last move and rescores its windows"""
+        position = self.position
+        col, player = position.moves[-1]
+        position.undo()
+        self._update(position.heights[col], -player)
+
+    def _update(self, bit, change):
+        """Adds change to the cell's digit in every window through it"""
+        codes = self._codes
+        scores = self._scores
+        table = self._table
+        score = self.score
+        for index, place in self._cell_windows.get(bit, ()):
+            code = codes[index] + change * place
+            codes[index] = code
+            new = table[code]
+            score += new - scores[index]
+            scores[index] = new
+        self.score = score
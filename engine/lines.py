@@ -0,0 +1,60 @@
+"""Precomputed winning lines for each board size."""
+
+_tables = {}
+
+
+class LineTable:
+    """Every line of ``connect`` cells on a ``rows`` x ``cols`` board
+
+    Lines are listed horizontal, vertical, diagonal (down-right) then
+    anti-diagonal (up-right), each cell ordered the way evaluate_board reads
+    a window, with rows counted from the top. Each line is also given as
+    flat ``row * cols + col`` indices (for NumPy), as bit indices and a
+    bitmask in the ``Position`` layout, and every cell maps to the lines
+    through it.
+    """
+    def __init__(self, rows, cols, connect):
+        """Build the tables; use line_table() to get a shared instance"""
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+        span = range(connect)
+        cells = []
+        for row in range(rows):
+            for col in range(cols - connect + 1):
+                cells.append(tuple((row, col + i) for i in span))
+        for col in range(cols):
+            for row in range(rows - connect + 1):
+                cells.append(tuple((row + i, col) for i in span))
+        for row in range(rows - connect + 1):
+            for col in range(cols - connect + 1):
+                cells.append(tuple((row + i, col + i) for i in span))
+        for row in range(rows - connect + 1):
+            for col in range(cols - connect + 1):
+                cells.append(tuple((row + connect - 1 - i, col + i) for i in span))
+        self.cells = tuple(cells)
+        self.flat = tuple(tuple(row * cols + col for row, col in line) for line in cells)
+        self.bits = tuple(tuple(self.bit(row, col) for row, col in line) for line in cells)
+        self.masks = tuple(sum(1 << bit for bit in line) for line in self.bits)
+        # cell -> ((line index, place in line), ...)
+        cell_lines = {}
+        for index, line in enumerate(cells):
+            for place, cell in enumerate(line):
+                cell_lines.setdefault(cell, []).append((index, place))
+        self.cell_lines = {cell: tuple(lines) for cell, lines in cell_lines.items()}
+        self.bit_lines = {self.bit(*cell): lines for cell, lines in self.cell_lines.items()}
+        # bit -> masks of the lines through it, for checking a single move
+        self.bit_masks = {bit: tuple(self.masks[index] for index, _ in lines)
+                          for bit, lines in self.bit_lines.items()}
+
+    def bit(self, row, col):
+        """Returns the Position bit index of a cell, rows counted from the top"""
+        return col * (self.rows + 1) + self.rows - 1 - row
+
+
+def line_table(rows, cols, connect):
+    """Returns the shared LineTable for a board size, building it once"""
+    size = (rows, cols, connect)
+    if size not in _tables:
+        _tables[size] = LineTable(rows, cols, connect)
+    return _tables[size]
@@ -0,0 +1,98 @@
+"""Move ordering heuristics for the alpha-beta searches."""
+
+CENTER = "center"   # try columns from the middle out
+TT_MOVE = "tt"      # try the transposition table's best move first
+KILLER = "killer"   # try moves that caused a cutoff at the same ply
+HISTORY = "history" # try moves that caused cutoffs anywhere in the search
+HEURISTICS = (CENTER, TT_MOVE, KILLER, HISTORY)
+
+
+def center_order(cols):
+    """Returns the columns sorted from the center out"""
+    center = (cols - 1) / 2
+    return sorted(range(cols), key=lambda col: abs(col - center))
+
+
+class MoveOrderer:
+    """Picks the order a node's moves are searched in
+
+    Each heuristic can be switched on or off, and the orderer counts the
+    nodes it ordered and where in the move list their cutoffs happened, so
+    the heuristics can be compared on the same positions.
+    """
+    def __init__(self, cols, heuristics=HEURISTICS):
+        """Set up the static order and empty killer and history tables"""
+        unknown = set(heuristics) - set(HEURISTICS)
+        if unknown:
+            raise ValueError(f"unknown move ordering heuristics: {', '.join(sorted(unknown))}")
+        self._heuristics = frozenset(heuristics)
+        self._static = center_order(cols) if CENTER in self._heuristics else list(range(cols))
+        self._killers = {} # ply -> up to 2 columns that caused a cutoff there
+        self._history = {} # (player, landing bit) -> cutoff score
+        self.nodes = 0
+        self.cutoffs = 0
+        self.cutoffs_by_index = [0] * cols
+
+    @property
+    def heuristics(self):
+        """Returns the heuristics in use"""
+        return self._heuristics
+
+    @property
+    def first_move_cutoff_rate(self):
+        """Returns the fraction of cutoffs caused by the first move tried"""
+        return self.cutoffs_by_index[0] / self.cutoffs if self.cutoffs else 0.0
+
+    def new_search(self):
+        """Forget the killers and age the history before a new search"""
+        self._killers = {}
+        self._history = {move: score // 2 for move, score in self._history.items() if score > 1}
+
+    def order(self, board, player, tt_move=None):
+        """Returns the playable columns in the order to search them"""
+        self.nodes += 1
+        columns = [col for col in self._static if board.can_play(col)]
+        if HISTORY in self._heuristics and self._history:
+            history = self._history
+            heights = board.heights
+            # stable sort keeps the static order between equal scores
+            columns.sort(key=lambda col: history.get((player, heights[col]), 0), reverse=True)
+        front = []
+        if TT_MOVE in self._heuristics and tt_move is not None:
+            front.append(tt_move)
+        if KILLER in self._heuristics:
+            front.extend(self._killers.get(len(board.moves), ()))
+        for col in reversed(front):
+            if col in columns:
+                columns.remove(col)
+                columns.insert(0, col)
+        return columns
+
+    def cutoff(self, board, player, col, depth, index):
+        """Records that the move at position index caused a cutoff"""
+        self.cutoffs += 1
+        self.cutoffs_by_index[index] += 1
+        if KILLER in self._heuristics:
+            ply = len(board.moves)
+            killers = self._killers.get(ply, [])
+            if col not in killers:
+                self._killers[ply] = [col] + killers[:1]
+        if HISTORY in self._heuristics:
+            move = (player, board.heights[col])
+            self._history[move] = self._history.get(move, 0) + depth * depth
+
+    def stats(self):
+        """Returns the counters as a dict"""
+        return {
+            "heuristics": sorted(self._heuristics),
+            "nodes": self.nodes,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoff_rate": round(self.first_move_cutoff_rate, 4),
+            "cutoffs_by_index": list(self.cutoffs_by_index),
+        }
+
+    def reset_stats(self):
+        """Zero the node and cutoff counters"""
+        self.nodes = 0
+        self.cutoffs = 0
+        self.cutoffs_by_index = [0] * len(self.cutoffs_by_index)
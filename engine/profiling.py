@@ -0,0 +1,95 @@
+"""cProfile wrapper for the AI's moves, with a report grouped by what the time went to."""
+
+import cProfile
+import io
+import os
+import pstats
+
+# report group -> (module file, function names), None for every function in the module.
+# Self time is used, so each function's own work lands in exactly one group.
+GROUPS = (
+    ("check_winner", (("bitboard.py", ("is_winner", "is_winning_move", "is_full")),)),
+    ("evaluate_window", (("evaluation.py", None), ("incremental.py", ("reset", "_update")), ("batch.py", None),
+                         ("search.py", ("evaluate_leaf",)))),
+    ("board copy and make/unmake", (("bitboard.py", ("copy", "play", "undo", "cell")), ("incremental.py", ("play", "undo")))),
+    ("move generation", (("ordering.py", None), ("bitboard.py", ("can_play", "height")))),
+    ("search", (("search.py", None), ("solver.py", None), ("threats.py", None), ("transposition.py", None), ("book.py", None))),
+)
+
+
+def group_of(filename, function):
+    """Returns the report group of a profiled function"""
+    name = os.path.basename(filename)
+    for group, members in GROUPS:
+        for module, functions in members:
+            if name == module and (functions is None or function in functions):
+                return group
+    return "other"
+
+
+class MoveProfiler:
+    """Profiles each AI move and writes the profiles to a directory
+
+    Every move is dumped to ``move_<game>_<move>.prof`` and every game to
+    ``game_<game>.prof``, in the format pstats, snakeviz and flameprof
+    read. ``report.txt`` splits the time of all games so far into GROUPS
+    and lists the most expensive functions.
+    """
+    def __init__(self, directory):
+        """Create the output directory"""
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.games = 0
+        self.moves = 0
+        self._game = None # pstats.Stats of the game in progress
+        self._total = None # pstats.Stats of every game
+
+    def run(self, function, *args):
+        """Calls function(*args) under the profiler and returns its result"""
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(function, *args)
+        finally:
+            self.moves += 1
+            profile.dump_stats(os.path.join(self.directory, f"move_{self.games + 1}_{self.moves}.prof"))
+            if self._game is None:
+                self._game = pstats.Stats(profile)
+            else:
+                self._game.add(profile)
+
+    def end_game(self):
+        """Writes the game's profile and the report covering every game so far
+
+        Returns the report's path, or None if no move was profiled.
+        """
+        if self._game is None:
+            return None
+        self.games += 1
+        self._game.dump_stats(os.path.join(self.directory, f"game_{self.games}.prof"))
+        if self._total is None:
+            self._total = self._game
+        else:
+            self._total.add(self._game)
+        self._game = None
+        self.moves = 0
+        path = os.path.join(self.directory, "report.txt")
+        with open(path, "w") as file:
+            file.write(self.report())
+        return path
+
+    def report(self, top=25):
+        """Returns the time of every finished game split by group, then the top functions"""
+        stats = self._total
+        groups = {}
+        for (filename, line, function), (calls, _, self_time, _, _) in stats.stats.items():
+            group = groups.setdefault(group_of(filename, function), [0, 0.0])
+            group[0] += calls
+            group[1] += self_time
+        total = sum(seconds for _, seconds in groups.values()) or 1.0
+        lines = [f"{self.games} game(s), {total:.3f}s profiled", "", f"{'group':<28}{'calls':>12}{'seconds':>10}{'share':>8}"]
+        for group, (calls, seconds) in sorted(groups.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{group:<28}{calls:>12}{seconds:>10.3f}{seconds / total:>8.1%}")
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("tottime").print_stats(top)
+        return "\n".join(lines) + "\n\n" + out.getvalue()
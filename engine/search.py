@@ -0,0 +1,503 @@
+"""Negamax search with principal variation search, shared by the text and pygame front ends."""
+
+import random
+import time
+from contextlib import contextmanager
+
+from .batch import BatchEvaluator
+from .book import side_to_move
+from .evaluation import NO_EVS, evaluate_board, pattern_table
+from .incremental import IncrementalEvaluator
+from .ordering import HEURISTICS, MoveOrderer, center_order
+from .solver import LOSS, Solver
+from .threats import WIN, scan
+from .transposition import EXACT, LOWER, UPPER, SIDE_KEY, TranspositionTable
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the move's time or node budget runs out"""
+
+
+class SearchCancelled(Exception):
+    """Raised out of get_move when another thread called Engine.stop"""
+
+
+ASPIRATION = 8 # half width of the root window around the previous depth's score
+
+
+@contextmanager
+def restoring(position):
+    """Takes back the moves played on position inside the block, however the block is left
+
+    A search that runs out of budget or is cancelled raises out of the
+    middle of its tree and leaves its moves on the board.
+    """
+    moves_played = len(position.moves)
+    try:
+        yield
+    finally:
+        while len(position.moves) > moves_played:
+            position.undo()
+
+
+class SearchStats:
+    """What one get_move call did
+
+    ``source`` is "book", "threat", "solver" or "search"; the other
+    fields only count the heuristic search. ``pv`` is the principal variation starting
+    with the move played, ``score`` its score for the engine's player and
+    ``re_searches`` counts both null-window and aspiration re-searches.
+
+    A ``detailed`` collector also counts the nodes at each ply below the
+    root, the leaf evaluations and the cutoffs by the index of the move
+    that caused them, and times each root move. The engine only makes
+    detailed ones when asked to, since they cost a call per node.
+    """
+    def __init__(self, detailed=False):
+        """Start with nothing searched"""
+        self.source = "search"
+        self.depth = 0
+        self.score = None
+        self.pv = []
+        self.nodes = 0
+        self.cutoffs = 0
+        self.re_searches = 0
+        self.tt_hits = 0
+        self.tt_probes = 0
+        self.seconds = 0.0
+        self.detailed = detailed
+        if detailed:
+            self.root_ply = 0
+            self.nodes_by_ply = []
+            self.leaf_evaluations = 0
+            self.cutoffs_by_index = []
+            self.root_moves = {} # column -> its last score and the nodes and time of all its searches
+
+    @property
+    def branching_factor(self):
+        """Returns the mean ratio of nodes between one ply and the next"""
+        counts = self.nodes_by_ply
+        ratios = [counts[i + 1] / counts[i] for i in range(len(counts) - 1) if counts[i]]
+        return sum(ratios) / len(ratios) if ratios else 0.0
+
+    def node(self, ply):
+        """Counts a node ply moves below the root"""
+        counts = self.nodes_by_ply
+        if ply >= len(counts):
+            counts.extend([0] * (ply + 1 - len(counts)))
+        counts[ply] += 1
+
+    def cutoff(self, index):
+        """Counts a cutoff caused by the move at position index"""
+        counts = self.cutoffs_by_index
+        while len(counts) <= index:
+            counts.append(0)
+        counts[index] += 1
+
+    def root_move(self, col, score, nodes, seconds):
+        """Records one search of a root move"""
+        move = self.root_moves.setdefault(col, {"score": None, "nodes": 0, "seconds": 0.0})
+        move["score"] = score
+        move["nodes"] += nodes
+        move["seconds"] += seconds
+
+    def as_dict(self):
+        """Returns the stats as a dict"""
+        stats = dict(vars(self))
+        if self.detailed:
+            stats["branching_factor"] = round(self.branching_factor, 3)
+        return stats
+
+
+class Engine:
+    """An AI player: its evaluation settings and its search state
+
+    ``player`` is the id (1 or 2) the engine picks moves for and scores
+    positions for. Without a budget every root move gets a ``depth`` ply
+    search. With ``move_time`` (seconds) or ``max_nodes`` the search goes one
+    ply deeper at a time until the budget runs out and the best move of the
+    last finished depth is played. With an opening ``book`` the positions it
+    holds are answered from it without searching. With ``solve_empty`` set,
+    positions with that many empty cells or fewer are solved exactly, as
+    long as the solve takes at most ``solve_nodes`` nodes.
+
+    The transposition table, move orderer and incremental evaluator live as
+    long as the engine, so one engine should be used per AI and per game
+    settings.
+    """
+    def __init__(self, player, evs=NO_EVS, rows=6, cols=7, connect=4, depth=3,
+                 move_time=None, max_nodes=None, ordering=HEURISTICS,
+                 tt_bytes=16 * 1024 * 1024, book=None, solve_empty=None, solve_nodes=100000,
+                 collect_stats=False):
+        """Set up the engine's tables"""
+        if book is not None and not book.matches(rows, cols, connect, evs):
+            raise ValueError("the opening book was built for another board size or other EVs")
+        self.player = player
+        self.opponent = 3 - player
+        self.evs = tuple(evs)
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+        self.depth = depth
+        self.move_time = move_time
+        self.max_nodes = max_nodes
+        self.book = book
+        self.solve_empty = solve_empty
+        self.solve_nodes = solve_nodes
+        self.solver = Solver(cols, tt_bytes, self._check_solve) if solve_empty is not None else None
+        self.table = TranspositionTable(tt_bytes)
+        self.orderer = MoveOrderer(cols, ordering)
+        self.nodes = 0 # minimax nodes visited by the last search
+        self.search_stats = SearchStats() # stats of the last get_move
+        self.collect_stats = collect_stats # give each get_move a detailed SearchStats
+        self._collector = None # the detailed SearchStats of the search running, if any
+        self._patterns = pattern_table(player, self.evs, cols, connect)
+        self._evaluator = None
+        self._deadline = None
+        self._node_limit = None
+        self._stopped = False
+
+    def stop(self):
+        """Asks a search running on another thread to give up
+
+        The search notices within 256 nodes and get_move raises
+        SearchCancelled, with the position restored. The stop holds until
+        resume is called, so it also cancels a search handed to another
+        thread that has not started yet.
+        """
+        self._stopped = True
+
+    def resume(self):
+        """Lets searches run again after stop; call it before handing a search to another thread"""
+        self._stopped = False
+
+    def _check_solve(self):
+        """Abandons a solve that was stopped or ran past its node budget"""
+        if self._stopped:
+            raise SearchCancelled()
+        if self.solver.nodes >= self.solve_nodes:
+            raise SearchTimeout()
+
+    def evaluate(self, position):
+        """Returns the position's score for the engine's player, rescanning the board"""
+        return evaluate_board(position, self.player, self.evs)
+
+    def batch_evaluator(self):
+        """Returns a BatchEvaluator giving the same scores as evaluate"""
+        return BatchEvaluator(self.rows, self.cols, self._patterns, self.player, self.opponent, self.connect)
+
+    def sync(self, position):
+        """Points the incremental evaluator at position and rescores it
+
+        Call this before running minimax on a position by hand;
+        get_move does it itself.
+        """
+        if self._evaluator is None or self._evaluator.position is not position:
+            self._evaluator = IncrementalEvaluator(position, self._patterns)
+        else:
+            self._evaluator.reset()
+        return self._evaluator
+
+    def get_move(self, position):
+        """Returns the column the engine plays in position, where its player is to move"""
+        return self._search(position)
+
+    def ponder(self, position, replies):
+        """Searches the engine's answer to each opponent reply, on the opponent's time
+
+        position has the opponent to move. The answers go into replies,
+        keyed by the position key after the reply, as each one is found, so
+        whatever was finished before Engine.stop is kept. The reply the last
+        search expected is searched first, then the rest from the center out.
+        """
+        entry = self.table.probe(position.key)
+        expected = [entry[3]] if entry is not None and entry[3] is not None else []
+        for col in expected + [col for col in center_order(self.cols) if col not in expected]:
+            if not position.can_play(col):
+                continue
+            position.play(col, self.opponent)
+            try:
+                if position.key not in replies and not position.is_winner(self.opponent) and not position.is_full():
+                    replies[position.key] = self._search(position)
+            finally:
+                position.undo()
+        return replies
+
+    def _search(self, position):
+        """Picks the move in position, letting a pending stop cancel it"""
+        if self._stopped:
+            raise SearchCancelled()
+        self.search_stats = stats = SearchStats(self.collect_stats)
+        if self.collect_stats:
+            stats.root_ply = len(position.moves)
+            self._collector = stats
+        hits, misses = self.table.hits, self.table.misses
+        start = time.perf_counter()
+        try:
+            return self._pick(position, stats)
+        finally:
+            self._collector = None
+            stats.nodes = self.nodes
+            stats.seconds = time.perf_counter() - start
+            stats.tt_hits = self.table.hits - hits
+            stats.tt_probes = stats.tt_hits + self.table.misses - misses
+
+    def _pick(self, position, stats):
+        """Returns the book's, a forced, the solver's or the search's move, filling in stats"""
+        # the book was built with player 1 moving first, so it only fits games that started that way
+        if self.book is not None and side_to_move(position) == self.player:
+            col = self.book.move(position.key)
+            if col is not None and position.can_play(col):
+                self.nodes = 0
+                stats.source = "book"
+                stats.pv = [col]
+                return col
+        columns = [col for col in range(self.cols) if position.can_play(col)]
+        random.shuffle(columns)
+        # wins on the spot and forced moves need no search, moves handing the opponent a win get none
+        kind, columns = scan(position, self.player, columns)
+        if kind == WIN or len(columns) == 1:
+            self.nodes = 0
+            stats.source = "threat"
+            stats.pv = [columns[0]]
+            return columns[0]
+        if self.solver is not None and self.rows * self.cols - len(position.moves) <= self.solve_empty:
+            col = self.solve(position)
+            if col is not None:
+                stats.source = "solver"
+                stats.pv = [col]
+                return col
+        self.table.new_search()
+        self.orderer.new_search()
+        self.sync(position)
+        self.nodes = 0
+        with restoring(position):
+            if self.move_time is None and self.max_nodes is None:
+                best_move, scores = self.search_root(position, columns, self.depth)
+                stats.depth = self.depth
+                stats.score = scores[best_move]
+            else:
+                best_move = self.deepen(position, columns)
+        stats.pv = self.principal_variation(position, best_move, stats.depth)
+        return best_move
+
+    def solve(self, position):
+        """Returns the solver's move, or None if the position is lost or too big to solve
+
+        A lost position is left to the heuristic search, which still picks
+        the moves an imperfect opponent is most likely to go wrong against.
+        """
+        self.solver.nodes = 0
+        try:
+            with restoring(position):
+                col, value = self.solver.best_move(position, self.player)
+        except SearchTimeout:
+            return None
+        finally:
+            self.nodes = self.solver.nodes
+        return None if value == LOSS else col
+
+    def deepen(self, position, columns):
+        """Searches one ply deeper at a time until the budget runs out
+
+        From the second depth on, the root is first searched with an
+        aspiration window around the previous depth's score, and searched
+        again with a full window only if the score falls outside it.
+        """
+        stats = self.search_stats
+        start = time.perf_counter()
+        max_depth = max(1, self.rows * self.cols - len(position.moves) - 1) # plies left below a root move
+        depth = 1
+        try:
+            with restoring(position):
+                while True:
+                    if depth == 1:
+                        move, scores = self.search_root(position, columns, depth)
+                    else:
+                        guess = stats.score
+                        move, scores = self.search_root(position, columns, depth, guess - ASPIRATION, guess + ASPIRATION)
+                        if move is None or scores[move] >= guess + ASPIRATION:
+                            stats.re_searches += 1
+                            move, scores = self.search_root(position, columns, depth)
+                    # only a finished depth's move is played
+                    best_move = move
+                    stats.depth = depth
+                    stats.score = scores[best_move]
+                    if depth >= max_depth:
+                        break
+                    # the first depth always finishes so there is a move to play
+                    if self.move_time is not None:
+                        self._deadline = start + self.move_time
+                    self._node_limit = self.max_nodes
+                    # try the best moves of this depth first on the next one
+                    columns.sort(key=lambda col: scores[col], reverse=True)
+                    depth += 1
+        except SearchTimeout:
+            pass # the last finished depth's move is played
+        finally:
+            self._deadline = None
+            self._node_limit = None
+        return best_move
+
+    def search_root(self, position, columns, depth, alpha=-float('inf'), beta=float('inf')):
+        """Searches the root moves to depth, returns the best move and each move's score
+
+        A move has to beat the best score so far to matter, so after the
+        first one each move is searched with a null window just above it
+        and only searched again, with a full window, if it beats it. Moves
+        scoring alpha or less are never best, and the search stops at the
+        first move scoring beta or more.
+        """
+        stats = self.search_stats
+        scores = {}
+        best_score = alpha
+        best_move = None
+        evaluator = self._evaluator
+        opponent = self.opponent
+        collector = self._collector
+        for col in columns:
+            if collector is not None:
+                start, nodes = time.perf_counter(), self.nodes
+            evaluator.play(col, self.player)
+            if best_move is None:
+                score = -self.negamax(position, depth, opponent, -beta, -best_score)
+            else:
+                score = -self.negamax(position, depth, opponent, -best_score - 1, -best_score)
+                if best_score < score < beta:
+                    stats.re_searches += 1
+                    score = -self.negamax(position, depth, opponent, -beta, -best_score)
+            evaluator.undo()
+            scores[col] = score
+            if collector is not None:
+                collector.root_move(col, score, self.nodes - nodes, time.perf_counter() - start)
+
+            if score > best_score:
+                best_score = score
+                best_move = col
+                if score >= beta:
+                    break
+        return best_move, scores
+
+    def principal_variation(self, position, col, depth):
+        """Returns the moves the search expects, starting with col, read back from the transposition table"""
+        pv = []
+        player = self.player
+        while col is not None and len(pv) <= depth and position.can_play(col):
+            pv.append(col)
+            position.play(col, player)
+            if position.is_winner(player) or position.is_full():
+                break
+            player = 3 - player
+            key = position.key ^ SIDE_KEY if player == self.player else position.key
+            entry = self.table.peek(key)
+            col = entry[3] if entry is not None else None
+        for _ in pv:
+            position.undo()
+        return pv
+
+    def budget_exhausted(self):
+        """Returns True once the search in progress has used up its nodes or time"""
+        if self._stopped:
+            raise SearchCancelled()
+        if self._node_limit is not None and self.nodes >= self._node_limit:
+            return True
+        return self._deadline is not None and time.perf_counter() >= self._deadline
+
+    def minimax(self, position, depth, is_maximizing, alpha, beta):
+        """Returns the alpha-beta value of position for the engine's player
+
+        Moves are played through the incremental evaluator set up by sync,
+        which keeps the leaf score current without rescanning the board.
+        """
+        if is_maximizing:
+            return self.negamax(position, depth, self.player, alpha, beta)
+        return -self.negamax(position, depth, self.opponent, -beta, -alpha)
+
+    def negamax(self, position, depth, player, alpha, beta):
+        """Returns the value of position for player, who is to move
+
+        The value is the engine's score when player is the engine and its
+        negation when player is the opponent, so both sides maximize. The
+        first move is searched with the full window; the rest only have to
+        prove with a null window that they are no better, and are searched
+        again if they are.
+        """
+        self.nodes += 1
+        # the clock is only read every 256 nodes
+        if not self.nodes & 255 and self.budget_exhausted():
+            raise SearchTimeout()
+
+        opponent = 3 - player
+        evaluator = self._evaluator
+        collector = self._collector
+        if collector is not None:
+            collector.node(len(position.moves) - collector.root_ply)
+        if depth == 0 or position.is_winner(opponent) or position.is_winner(player) or position.is_full():
+            if collector is not None:
+                collector.leaf_evaluations += 1
+            score = self.evaluate_leaf(position)
+            return score if player == self.player else -score
+
+        # reuse what an earlier search found for this position
+        table = self.table
+        key = position.key ^ SIDE_KEY if player == self.player else position.key
+        entry = table.probe(key)
+        tt_move = entry[3] if entry is not None else None
+        if entry is not None and entry[0] >= depth:
+            tt_depth, tt_score, tt_bound, tt_move = entry
+            if tt_bound == EXACT:
+                return tt_score
+            if tt_bound == LOWER:
+                alpha = max(alpha, tt_score)
+            else:
+                beta = min(beta, tt_score)
+            if beta <= alpha:
+                return tt_score
+
+        window = (alpha, beta)
+        best_eval = -float('inf')
+        best_move = None
+        orderer = self.orderer
+        for index, col in enumerate(orderer.order(position, player, tt_move)):
+            evaluator.play(col, player)
+            if index == 0:
+                eval = -self.negamax(position, depth - 1, opponent, -beta, -alpha)
+            else:
+                eval = -self.negamax(position, depth - 1, opponent, -alpha - 1, -alpha)
+                if alpha < eval < beta:
+                    self.search_stats.re_searches += 1
+                    eval = -self.negamax(position, depth - 1, opponent, -beta, -alpha)
+            evaluator.undo()
+            if eval > best_eval:
+                best_eval = eval
+                best_move = col
+            alpha = max(alpha, eval)
+            if beta <= alpha:
+                self.search_stats.cutoffs += 1
+                if collector is not None:
+                    collector.cutoff(index)
+                orderer.cutoff(position, player, col, depth, index)
+                break
+
+        # the window the node was searched with decides what kind of bound the score is
+        if best_eval <= window[0]:
+            bound = UPPER
+        elif best_eval >= window[1]:
+            bound = LOWER
+        else:
+            bound = EXACT
+        table.store(key, depth, best_eval, bound, best_move)
+        return best_eval
+
+    def evaluate_leaf(self, position):
+        """Same score as evaluate, with the windows' part kept by the incremental evaluator"""
+        score = self._evaluator.score
+        if position.is_winner(self.player):
+            score += 100
+        elif position.is_winner(self.opponent):
+            score -= 100
+        return score
+
+    def stats(self):
+        """Returns the last search's stats and the move ordering and transposition table counters"""
+        return {"search": self.search_stats.as_dict(), "ordering": self.orderer.stats(), "transposition_table": self.table.stats()}
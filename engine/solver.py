@@ -0,0 +1,131 @@
+"""Exact endgame solver: negamax with null windows over win, draw and loss."""
+
+from .ordering import center_order
+from .transposition import EXACT, LOWER, UPPER, SIDE_KEY, TranspositionTable
+
+# values of a position for the side to move under perfect play
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+
+class Solver:
+    """Plays positions out to the end of the game to find their exact value
+
+    Only three values exist, so a search never needs a window wider than
+    one: solve asks "is it a win?" and then "is it at least a draw?" with
+    two null-window searches. The transposition table keeps what those
+    searches proved; the values hold forever, so it is never aged. The same
+    disks can come up with either player to move, so the side to move is
+    part of the key.
+
+    check, if given, is called every 256 nodes and may raise to abandon
+    the solve, leaving the position to be restored by the caller.
+    """
+    def __init__(self, cols, tt_bytes=16 * 1024 * 1024, check=None):
+        """Set up the solver's table"""
+        self.table = TranspositionTable(tt_bytes)
+        self.nodes = 0 # negamax nodes visited since the counter was last reset
+        self._order = center_order(cols)
+        self._check = check
+
+    def solve(self, position, player):
+        """Returns WIN, DRAW or LOSS for player, who is to move"""
+        if self.negamax(position, player, DRAW, WIN) > DRAW:
+            return WIN
+        if self.negamax(position, player, LOSS, DRAW) > LOSS:
+            return DRAW
+        return LOSS
+
+    def best_move(self, position, player):
+        """Returns the best column for player and its value"""
+        columns = [col for col in self._order if position.can_play(col)]
+        for col in columns:
+            if position.is_winning_move(col, player):
+                return col, WIN
+        opponent = 3 - player
+        best_col = None
+        best_value = LOSS
+        for col in columns:
+            position.play(col, player)
+            if position.is_full():
+                value = DRAW
+            elif best_col is None:
+                value = -self.solve(position, opponent)
+            else:
+                # a null window just above the best value only asks if the move is better
+                value = -self.negamax(position, opponent, -best_value - 1, -best_value)
+                if value > best_value:
+                    value = -self.solve(position, opponent)
+            position.undo()
+            if best_col is None or value > best_value:
+                best_col = col
+                best_value = value
+                if value == WIN:
+                    break
+        return best_col, best_value
+
+    def negamax(self, position, player, alpha, beta):
+        """Returns the value of position for player, who is to move, within (alpha, beta)
+
+        A result at or below alpha is an upper bound on the value, one at
+        or above beta a lower bound.
+        """
+        self.nodes += 1
+        if not self.nodes & 255 and self._check is not None:
+            self._check()
+
+        if position.is_full():
+            return DRAW
+        columns = [col for col in self._order if position.can_play(col)]
+        for col in columns:
+            if position.is_winning_move(col, player):
+                return WIN
+        # the opponent's immediate wins have to be blocked, two of them can't be
+        opponent = 3 - player
+        threats = [col for col in columns if position.is_winning_move(col, opponent)]
+        if len(threats) > 1:
+            return LOSS
+        if threats:
+            columns = threats
+
+        table = self.table
+        key = position.key ^ SIDE_KEY if player == 1 else position.key
+        entry = table.probe(key)
+        if entry is not None:
+            tt_score, tt_bound, tt_move = entry[1:]
+            if tt_bound == EXACT:
+                return tt_score
+            if tt_bound == LOWER:
+                alpha = max(alpha, tt_score)
+            else:
+                beta = min(beta, tt_score)
+            if alpha >= beta:
+                return tt_score
+            if tt_move in columns:
+                columns.remove(tt_move)
+                columns.insert(0, tt_move)
+
+        window = (alpha, beta)
+        best_value = LOSS - 1
+        best_col = None
+        for col in columns:
+            position.play(col, player)
+            value = DRAW if position.is_full() else -self.negamax(position, opponent, -beta, -alpha)
+            position.undo()
+            if value > best_value:
+                best_value = value
+                best_col = col
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
+
+        if best_value <= window[0]:
+            bound = UPPER
+        elif best_value >= window[1]:
+            bound = LOWER
+        else:
+            bound = EXACT
+        # the number of empty cells stands in for depth: bigger subtrees are kept first
+        table.store(key, position.rows * position.cols - len(position.moves), best_value, bound, best_col)
+        return best_value
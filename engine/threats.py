@@ -0,0 +1,36 @@
+"""Immediate threats: moves that win on the spot, have to be blocked or hand the opponent a win."""
+
+WIN = "win"       # the side to move wins with any of the moves
+BLOCK = "block"   # the opponent wins next move unless this one column is played
+LOST = "lost"     # the opponent has two or more wins next move, none of the moves saves the game
+SAFE = "safe"     # none of the moves lets the opponent win in the cell right above it
+QUIET = "quiet"   # every move lets the opponent win right above, so none was dropped
+
+
+def scan(position, player, columns):
+    """Sorts out the immediate threats of player, who is to move
+
+    Returns a kind from above and the moves worth searching, in the order
+    of columns: the winning moves for WIN, the column to block for BLOCK,
+    and otherwise the moves that don't hand the opponent a win, or every
+    move when there is no such move.
+    """
+    wins = [col for col in columns if position.is_winning_move(col, player)]
+    if wins:
+        return WIN, wins
+    opponent = 3 - player
+    threats = [col for col in columns if position.is_winning_move(col, opponent)]
+    if len(threats) > 1:
+        return LOST, list(columns)
+    if threats:
+        return BLOCK, threats
+    safe = []
+    for col in columns:
+        position.play(col, player)
+        # only the cell above the move changed for the opponent
+        if not position.can_play(col) or not position.is_winning_move(col, opponent):
+            safe.append(col)
+        position.undo()
+    if safe:
+        return SAFE, safe
+    return QUIET, list(columns)
@@ -0,0 +1,114 @@
+"""Zobrist hashing and a fixed-size transposition table for the search."""
+
+import random
+
+# bound types stored with each score
+EXACT = 0 # the score is the position's exact value
+LOWER = 1 # the search failed high, the value is at least the score
+UPPER = 2 # the search failed low, the value is at most the score
+
+ENTRY_BYTES = 136 # rough cost of one stored entry (slot, tuple and its ints)
+DEPTH_PREFERRED = "depth"
+ALWAYS_REPLACE = "always"
+
+_zobrist_cache = {}
+
+
+def zobrist_keys(bits):
+    """Returns random 64-bit keys per player id and bit index
+
+    The keys are seeded so the same position hashes the same in every
+    process, and shared by every board with the same number of bits.
+    """
+    if bits not in _zobrist_cache:
+        rng = random.Random(0x5EED + bits)
+        _zobrist_cache[bits] = [
+            [rng.getrandbits(64) for _ in range(bits)] for _ in range(3)
+        ]
+    return _zobrist_cache[bits]
+
+
+# mixed into a key when the maximizing side is to move
+SIDE_KEY = random.Random(0x51DE).getrandbits(64)
+
+
+class TranspositionTable:
+    """Remembers search results by Zobrist key
+
+    Entries live in a fixed number of slots picked from the key, so memory
+    use is capped at roughly ``max_bytes``. When two keys want the same slot
+    the replacement policy decides who stays: ``"depth"`` keeps the deeper
+    search unless the stored entry is from an older search, ``"always"``
+    keeps the newest one.
+    """
+    def __init__(self, max_bytes=16 * 1024 * 1024, replacement=DEPTH_PREFERRED):
+        """Allocate the table"""
+        if replacement not in (DEPTH_PREFERRED, ALWAYS_REPLACE):
+            raise ValueError(f"unknown replacement policy: {replacement}")
+        self._size = max(1, max_bytes // ENTRY_BYTES)
+        self._replacement = replacement
+        self._slots = [None] * self._size
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    @property
+    def size(self):
+        """Returns the number of slots"""
+        return self._size
+
+    @property
+    def hit_rate(self):
+        """Returns the fraction of probes that found their key"""
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def new_search(self):
+        """Marks the stored entries as coming from an older search"""
+        self._generation += 1
+
+    def probe(self, key):
+        """Returns (depth, score, bound, move) stored for key, or None"""
+        entry = self._slots[key % self._size]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1:5]
+        self.misses += 1
+        return None
+
+    def peek(self, key):
+        """Same as probe without counting a hit or miss"""
+        entry = self._slots[key % self._size]
+        if entry is not None and entry[0] == key:
+            return entry[1:5]
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        """Saves a search result unless the slot holds something better"""
+        index = key % self._size
+        entry = self._slots[index]
+        if entry is not None and entry[0] != key:
+            if (self._replacement == DEPTH_PREFERRED
+                    and entry[5] == self._generation and entry[1] > depth):
+                return
+            self.overwrites += 1
+        self._slots[index] = (key, depth, score, bound, move, self._generation)
+        self.stores += 1
+
+    def clear(self):
+        """Drops every entry and resets the counters"""
+        self._slots = [None] * self._size
+        self.hits = self.misses = self.stores = self.overwrites = 0
+
+    def stats(self):
+        """Returns the counters as a dict"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "slots": self._size,
+        }
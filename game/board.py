@@ -1,12 +1,18 @@
 import pygame, random, sys, time, copy
+from concurrent.futures import ThreadPoolExecutor
 from .disk import Disk
 from .player import Player
 from .popup import Popup
 from .button import Button
+from . import text as cached_text
+from engine import Engine, Position, SearchCancelled
+from engine.evaluation import NO_EVS
+
+SOLVE_EMPTY = 20 # the AIs play perfectly once this many cells or fewer are empty
 
 class Board:
     """Creates an instance of Connect 4"""
-    def __init__(self, screen, rows, cols, game_type, efs, connect=4):
+    def __init__(self, screen, rows, cols, game_type, efs, connect=4, profiler=None, book=None):
         """Initialize the game board."""
         self._screen = screen
         self._rows = rows
@@ -25,6 +31,24 @@ class Board:
         self._gap_y = (self._rect.height - (self._disk_diameter * rows)) // (rows + 1) # set the gap between rows
         # create the disks
         self._disks = self.init_disks()
+        # the screen fill and board drawn once, for erasing what moves over them
+        self._background = self.init_background()
+        self._redraw_all = True # next frame repaints the whole screen
+        self._changed_disks = [] # disks recolored since the last frame
+        self._preview_drawn = None # (color, rect) the preview disk was last drawn with
+        self._message = None # turn text on screen and its rect
+        self._text_rect = None
+        # sprite-free copy of the board that the AI searches on
+        self._position = Position(rows, cols, connect)
+        self._player_ids = {} # player color -> player id in the position
+        self._engines = {} # search engine per AI player color
+        self._thinker = ThreadPoolExecutor(max_workers=1) # runs the AI's search off the frame loop
+        self._ai_move = None # future of the AI move being searched
+        self._ai_engine = None # engine running that search
+        self._profiler = profiler # MoveProfiler wrapped around the AI's searches, if profiling
+        self._book = book # OpeningBook the AIs with matching EVs play the opening from, if any
+        self._ponder = None # future of the AI's search on the human's time
+        self._replies = {} # position key after a human reply -> pondered AI move
         self._col_pos = [disk.center[0] for disk in self._disks[0]] # column center points
         self._col_rects = [
             pygame.Rect(x - self._disk_radius, self._rect.top, self._disk_diameter, self.rect.height) 
@@ -35,7 +59,7 @@ class Board:
         self._continue_playing = True
         self._player_index = 0 # tracks the current player
         self._opponent_index = 1 # tracks the opponent's index 
-        self._font = pygame.font.Font(None, 60) # font for Player's Turn Text
+        self._font_size = 60 # font size for Player's Turn Text
         self._new_game = False
         self._game_over = False
         self._game_over_popup = Popup(screen, (self._rect.left, self._rect.top), [
@@ -79,6 +103,17 @@ class Board:
             for j in range(self._cols)] for i in range(self._rows)
         ]
 
+    def init_background(self):
+        """Draws the parts of the screen that never change"""
+        background = pygame.Surface(self._screen.get_size())
+        background.fill((138,206,247))
+        pygame.draw.rect(background, (45,92,214), self.rect, border_radius=5)
+        return background
+
+    def erase(self, rect):
+        """Covers rect with the background again"""
+        self._screen.blit(self._background, rect, rect)
+
     def initialize_players(self):
         """Creates the players for the game and selects order"""
         colors = ["red", "yellow"] # disk colors
@@ -106,269 +141,164 @@ class Board:
         # shuffle the list of players 
         random.shuffle(self._players)    
 
+        # map the players' colors onto the position's player ids
+        self._player_ids = {player.color: i + 1 for i, player in enumerate(self._players)}
+
     def draw(self):
-        """Draws the game board and disks"""
-        # clear the screen
-        self._screen.fill((138,206,247))
-
-        # draw the game board
-        pygame.draw.rect(self._screen, (45,92,214), self.rect, border_radius=5)
-
-        # draw each disk
-        for i, row in enumerate(self.disks):
-            for j, disk in enumerate(row):
-                disk.draw() 
-        
-        # draw the preview disk on top
-        self._preview_disk.draw()
-
-        # create text to show current player
-        text = self._font.render(f"{self._players[self._player_index].name}'s Turn", True, (255, 255, 255))
-        textpos = text.get_rect()
-        textpos.left = self._rect.left
-        textpos.centery = int(self.screen_height * 0.10)
-
-        # draw the text
-        self._screen.blit(text, textpos)
-
-        # if the game is over, draw the popup
+        """Draws what changed since the last frame and returns the rects of the screen it drew on"""
+        dirty = []
+        if self._redraw_all:
+            # paint the background and every disk
+            self._redraw_all = False
+            self._screen.blit(self._background, (0, 0))
+            for row in self.disks:
+                for disk in row:
+                    disk.draw()
+            self._changed_disks = []
+            self._preview_drawn = None
+            self._message = None
+            self._text_rect = None
+            dirty.append(self._screen.get_rect())
+
+        # draw the disks that changed color
+        for disk in self._changed_disks:
+            disk.draw()
+            dirty.append(disk.rect)
+        self._changed_disks = []
+
+        # move the preview disk on top if it moved or changed color
+        preview = (self._preview_disk.color, self._preview_disk.rect.copy())
+        if preview != self._preview_drawn:
+            if self._preview_drawn is not None:
+                self.erase(self._preview_drawn[1])
+                dirty.append(self._preview_drawn[1])
+            self._preview_disk.draw()
+            dirty.append(preview[1])
+            self._preview_drawn = preview
+
+        # create text to show current player, with animated dots while the AI thinks
+        message = f"{self._players[self._player_index].name}'s Turn"
+        if self._ai_move is not None:
+            message += " - thinking" + "." * (pygame.time.get_ticks() // 300 % 4)
+        if message != self._message:
+            if self._text_rect is not None:
+                self.erase(self._text_rect)
+                dirty.append(self._text_rect)
+            text = cached_text.render(message, self._font_size, (255, 255, 255))
+            textpos = text.get_rect()
+            textpos.left = self._rect.left
+            textpos.centery = int(self.screen_height * 0.10)
+
+            # draw the text
+            self._screen.blit(text, textpos)
+            dirty.append(textpos)
+            self._message = message
+            self._text_rect = textpos
+
+        # if the game is over, draw the popup over a fresh copy of the board
         if self._game_over:
+            popup_rect = self._game_over_popup.rect
+            self.erase(popup_rect)
+            for row in self.disks:
+                for disk in row:
+                    if disk.rect.colliderect(popup_rect):
+                        disk.draw()
             self._game_over_popup.draw()
-
-    def make_move(self, board, col, player):
-        """Player makes a move. Update the board."""
-        # iterate through all of the rows in a column 
-        for row in range(len(board) - 1, -1, -1):
-            # if the row is white (empty), then change the color
-            if board[row][col].is_empty():
-                # change color to represent dropping a disk
-                board[row][col].color = player.color
-                break
+            dirty.append(popup_rect)
+        return dirty
+
+    def make_move(self, col, player):
+        """Player makes a move. Update the position and the disk it lands on."""
+        # the disk lands on the lowest empty row of the column
+        row = self._rows - 1 - self._position.height(col)
+        self._position.play(col, self._player_ids[player.color])
+        # change color to represent dropping a disk
+        self._disks[row][col].color = player.color
+        self._changed_disks.append(self._disks[row][col])
 
     def check_winner(self, board, player):
         """Returns True if the current player is a winner"""
-        for row in range(self._rows):
-            for col in range(self._cols):
-                if board[row][col].color == player.color:
-                    # Check horizontally
-                    if col + self._connect <= self._cols and all(board[row][col+i].color == player.color for i in range(self._connect)):
-                        return True
-                    # Check vertically
-                    if row + self._connect <= self._rows and all(board[row+i][col].color == player.color for i in range(self._connect)):
-                        return True
-                    # Check diagonally (positive slope)
-                    if col + self._connect <= self._cols and row + self._connect <= self._rows and all(board[row+i][col+i].color == player.color for i in range(self._connect)):
-                        return True
-                    # Check diagonally (negative slope)
-                    if col - self._connect + 1 >= 0 and row + self._connect <= self._rows and all(board[row+i][col-i].color == player.color for i in range(self._connect)):
-                        return True
-        return False
+        return board.is_winner(self._player_ids[player.color])
     
     def is_full(self, board):
         """Returns true if board is full (no more available moves)"""
-        return all(cell.is_empty() != True for cell in board[0])
+        return board.is_full()
     
     def is_valid_move(self, board, col):
         """Returns True if a valid move (player can drop a disk in that column)"""
-        return board[0][col].is_empty()
-    
-    def evaluate_window(self, window, player, EFmode):
-        score = 0
-
-        opponent = self._players[self._opponent_index] 
-
-        if window.count(player.color) == 4:
-            score += 100
-        elif window.count(player.color) == 3 and window.count("white") == 1:
-            score += 5
-        elif window.count(player) == 2 and window.count("white") == 2:
-            score += 2
-
-        if window.count(opponent.color) == 3 and window.count("white") == 1:
-            score -= 4
-
-        #only AI2 will run customized EFs
-        if EFmode and player.ev1_set:
-            # print("using strategy 1: trying to conquer the center")
-            # Conquer the center strategy: Assign higher scores to positions closer to the center - ATK
-            center_col = self._cols // 2
-            for i in range(4):
-                if window[i] == player.color:
-                    score += abs(center_col - (i + 1))  # Adjust the weight as needed
-        
-        if EFmode and player.ev2_set:
-            # print("using strategy 2: building a 7 trap.")
-            # 7-trap strategy - ATK
-            # Focuses on a particular 4-piece configuration with one player's piece at each end.
-            # It looks for a configuration where there is one piece of the current player (player), three empty spaces (EMPTY), and the player's pieces are at both ends of the configuration (window[0] and window[3]).
-            if window.count(player.color) == 1 and window.count("white") == 3:
-                # Check for a "7-trap" pattern: [X, ., ., O] or [O, ., ., X]
-                if window[0] == player.color and window[3] == player.color:
-                    score += 10
-        
-        if EFmode and player.ev3_set:
-            # print("using strategy 3: evaluating surrounding discs.")
-            # Evaluate surrounding discs: Check left, right, up, down, and both diagonals - ATK
-            for i in range(4):
-                # Check left
-                if i > 0 and window[i - 1] == player.color:
-                    score += 1
-                # Check right
-                if i < 3 and window[i + 1] == player.color:
-                    score += 1
-                # Check up
-                if window[i] == player.color and i < 2 and window[i + 2] == player.color:
-                    score += 1
-                # Check down
-                if window[i] == player.color and i > 1 and window[i - 2] == player.color:
-                    score += 1
-                # Check both diagonals
-                if i % 2 == 0 and window[i] == player.color and window[(i + 2) % 4] == player.color:
-                    score += 1
-        if EFmode and player.ev4_set:
-            # print("using strategy 4: block opponent's trap.")
-            # Evaluate blocking opponent's trap - DEFENSIVE
-            for i in range(2):
-                if window[i] == opponent.color and window[i + 2] == opponent.color and window[i + 1] == "white" and window[(i + 3) % 4] == "white":
-                    score -= 8
-
-        if EFmode and player.ev5_set:
-            # Check for forks
-            # print("using strategy 5: fork10.")
-            empty_count = window.count("white")
-            player_count = window.count(player.color)
-            opponent_count = window.count(opponent.color)
-
-            # Check for horizontal fork
-            if empty_count == 2 and player_count == 2 and opponent_count == 1:
-                score += 5
-
-            # Check for vertical fork
-            if empty_count == 3 and player_count == 1 and opponent_count == 2:
-                score += 5
-
-            # Check for diagonal (positive slope) fork
-            if empty_count == 2 and player_count == 2 and opponent_count == 1:
-                score += 5
-
-            # Check for diagonal (negative slope) fork
-            if empty_count == 3 and player_count == 1 and opponent_count == 2:
-                score += 5
-
-        if EFmode and player.ev6_set:
-            # Check for forks
-            # print("using strategy 6: fork25.")
-
-            empty_count = window.count("white")
-            player_count = window.count(player.color)
-            opponent_count = window.count(opponent.color)
-
-            # Check for horizontal fork
-            if empty_count == 2 and player_count == 2 and opponent_count == 1:
-                score += 10
-
-            # Check for vertical fork
-            if empty_count == 3 and player_count == 1 and opponent_count == 2:
-                score += 5
-
-            # Check for diagonal (positive slope) fork
-            if empty_count == 2 and player_count == 2 and opponent_count == 1:
-                score += 10
-
-            # Check for diagonal (negative slope) fork
-            if empty_count == 3 and player_count == 1 and opponent_count == 2:
-                score += 5
-
-        return score
-
-    def evaluate_board(self, board, EFmode):
-        score = 0
-
-        # Evaluate based on winning positions
-        if self.check_winner(board, self._players[self._player_index]):
-            score += 100
-        elif self.check_winner(board, self._players[self._opponent_index]):
-            score -= 100
-
-        # Evaluate based on the number of computer's pieces in rows, columns, and diagonals
-        for row in range(self._rows):
-            for col in range(self._cols - 3):
-                window = [board[row][col + i].color for i in range(4)]
-                score += self.evaluate_window(window, self._players[self._player_index], EFmode)
-
-        for col in range(self._cols):
-            for row in range(self._rows - 3):
-                window = [board[row + i][col].color for i in range(4)]
-                score += self.evaluate_window(window, self._players[self._player_index], EFmode)
-
-        for row in range(self._rows - 3):
-            for col in range(self._cols - 3):
-                window = [board[row + i][col + i].color for i in range(4)]
-                score += self.evaluate_window(window, self._players[self._player_index], EFmode)
-
-        for row in range(self._rows - 3):
-            for col in range(self._cols - 3):
-                window = [board[row + 3 - i][col + i].color for i in range(4)]
-                score += self.evaluate_window(window, self._players[self._player_index], EFmode)
-
-        return score
+        return board.can_play(col)
     
-    def minimax(self, board, depth, is_maximizing, alpha, beta, EFmode):
-        if depth == 0 or self.check_winner(board, self._players[self._opponent_index]) or self.check_winner(board, self._players[self._player_index]) or self.is_full(board):
-            return self.evaluate_board(board, EFmode)
-
-        if is_maximizing:
-            max_eval = -float('inf')
-            for col in range(self._cols):
-                if self.is_valid_move(board, col):
-                    board_copy = board_copy = [
-                        [Disk(disk.screen, disk.color, disk.center, disk.width) for disk in row]  # Create a copy of each Disk object in the row
-                        for row in self._disks
-                    ]
-                    self.make_move(board_copy, col, self._players[self._player_index])
-                    eval = self.minimax(board_copy, depth - 1, False, alpha, beta, EFmode)
-                    max_eval = max(max_eval, eval)
-                    alpha = max(alpha, eval)
-                    if beta <= alpha:
-                        break
-            return max_eval
-        else:
-            min_eval = float('inf')
-            for col in range(self._cols):
-                if self.is_valid_move(board, col):
-                    board_copy = board_copy = [
-                        [Disk(disk.screen, disk.color, disk.center, disk.width) for disk in row]  # Create a copy of each Disk object in the row
-                        for row in self._disks
-                    ]                    
-                    self.make_move(board_copy, col, self._players[self._opponent_index])
-                    eval = self.minimax(board_copy, depth - 1, True, alpha, beta, EFmode)
-                    min_eval = min(min_eval, eval)
-                    beta = min(beta, eval)
-                    if beta <= alpha:
-                        break
-            return min_eval
+    def get_engine(self, player):
+        """Returns the search engine of an AI player"""
+        if player.color not in self._engines:
+            evs = (player.ev1_set, player.ev2_set, player.ev3_set, player.ev4_set, player.ev5_set, player.ev6_set)
+            evs = evs if player.ef_mode else NO_EVS
+            book = self._book
+            if book is not None and not book.matches(self._rows, self._cols, self._connect, evs):
+                book = None # the book was searched with other EVs
+            self._engines[player.color] = Engine(
+                self._player_ids[player.color],
+                evs,
+                self._rows, self._cols, self._connect,
+                book=book,
+                solve_empty=SOLVE_EMPTY
+            )
+        return self._engines[player.color]
 
     def get_computer_move(self, player):
         """Use the minimax algorithm with Alpha-Beta pruning to make the computer's move"""
-        columns = [col for col in range(self._cols) if self.is_valid_move(self._disks, col)]
-        random.shuffle(columns)
-        best_score = -float('inf')
-        best_move = None
-
-        for col in columns:
-            if self.is_valid_move(self._disks, col):
-                board_copy = [
-                    [Disk(disk.screen, disk.color, disk.center, disk.width) for disk in row]  # Create a copy of each Disk object in the row
-                    for row in self._disks
-                ]
-                self.make_move(board_copy, col, player)
-                d = random.randint(3, 3)  # Randomly select a depth between 2 and 4
-                score = self.minimax(board_copy, d, False, -float('inf'), float('inf'), player.ef_mode)  # Depth can be adjusted.
-
-                if score > best_score:
-                    best_score = score
-                    best_move = col
-        return best_move
+        engine = self.get_engine(player)
+        engine.resume()
+        return engine.get_move(self._position)
+
+    def start_thinking(self, player):
+        """Starts searching the AI's move on the background thread"""
+        self._ai_engine = self.get_engine(player)
+        self._ai_engine.resume()
+        # the search gets its own copy so the board can keep drawing the live one
+        if self._profiler is not None:
+            self._ai_move = self._thinker.submit(self._profiler.run, self._ai_engine.get_move, self._position.copy())
+        else:
+            self._ai_move = self._thinker.submit(self._ai_engine.get_move, self._position.copy())
+
+    def stop_thinking(self):
+        """Cancels the AI search in progress, if any"""
+        if self._ai_move is not None:
+            self._ai_engine.stop()
+            # a search that never started has no result to wait for
+            if not self._ai_move.cancel():
+                try:
+                    self._ai_move.result()
+                except SearchCancelled:
+                    pass
+            self._ai_move = None
+            self._ai_engine = None
+
+    def start_pondering(self):
+        """Searches the AI's answers to the human's likely moves while the human thinks"""
+        ai = next(player for player in self._players if not player.is_human)
+        self._ai_engine = self.get_engine(ai)
+        self._ai_engine.resume()
+        self._ponder = self._thinker.submit(self._ai_engine.ponder, self._position.copy(), self._replies)
+
+    def stop_pondering(self):
+        """Stops pondering, keeping the replies it already answered"""
+        if self._ponder is not None:
+            self._ai_engine.stop()
+            if not self._ponder.cancel():
+                try:
+                    self._ponder.result()
+                except SearchCancelled:
+                    pass
+            self._ponder = None
+            self._ai_engine = None
+
+    def quit(self):
+        """Stops the AI search and exits"""
+        self.stop_pondering()
+        self.stop_thinking()
+        self._thinker.shutdown()
+        sys.exit(0)
     
     def run(self):
         """Process the game's events"""
@@ -383,6 +313,9 @@ class Board:
 
                 # clear the disks
                 self._disks = self.init_disks()
+                self._position = Position(self._rows, self._cols, self._connect)
+                self._replies = {}
+                self._redraw_all = True
 
                 # loser who lost the previous game starts first, change later
 
@@ -399,7 +332,7 @@ class Board:
                 # handle events
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
-                        sys.exit(0)
+                        self.quit()
                     # check if player is human
                     if current_player.is_human and not move_made:
                         # get the mouse's current position
@@ -416,55 +349,78 @@ class Board:
 
                             # if clicking on a column, attempt to drop a disk
                             if rect.collidepoint(point) and event.type == pygame.MOUSEBUTTONDOWN:
-                                if self.is_valid_move(self._disks, col):
-                                    self.make_move(self._disks, col, current_player)
+                                if self.is_valid_move(self._position, col):
+                                    self.stop_pondering()
+                                    self.make_move(col, current_player)
 
                                     # move was made, change flag to true to stop current player's turn
                                     move_made = True
                                     
-                if not current_player.is_human: # player computer (AI)
-                    col = self.get_computer_move(current_player)  # this function will calculate the best move for AI
-                    self.make_move(self._disks, col, current_player)
-
-                    # move was made, change flag to true to stop current player's turn
-                    move_made = True
+                # in AI vs Player the AI searches its answers to the human's
+                # moves while waiting for the human to pick one
+                if current_player.is_human and not move_made and self._ponder is None:
+                    self.start_pondering()
 
-                self.draw()
-                if self._game_type == 0:
+                if not current_player.is_human: # player computer (AI)
+                    # the AI thinks on a background thread so the window keeps
+                    # redrawing and handling events until its move is ready
+                    if self._ai_move is None and self._position.key in self._replies:
+                        # the human played a reply the AI pondered, answer right away
+                        col = self._replies[self._position.key]
+                        self._replies = {}
+                        self.make_move(col, current_player)
+                        move_made = True
+                    elif self._ai_move is None:
+                        self._replies = {}
+                        self.start_thinking(current_player)
+                    elif self._ai_move.done():
+                        col = self._ai_move.result()
+                        self._ai_move = None
+                        self._ai_engine = None
+                        self.make_move(col, current_player)
+
+                        # move was made, change flag to true to stop current player's turn
+                        move_made = True
+
+                dirty = self.draw()
+                if self._game_type == 0 and move_made:
                     time.sleep(0.1)
                 self._clock.tick(self._frame_rate)
                 
-                pygame.display.update()
+                pygame.display.update(dirty)
 
             # check if current player is a winner
-            if self.check_winner(self._disks, self._players[self._player_index]):
+            if self.check_winner(self._position, self._players[self._player_index]):
                 self._game_over = True
                 self._game_over_popup.update_message(f"{self._players[self._player_index].name} wins!")
 
             # check if opponent is a winner
-            if self.check_winner(self._disks, self._players[self._opponent_index]):
+            if self.check_winner(self._position, self._players[self._opponent_index]):
                 self._game_over = True
                 self._game_over_popup.update_message(f"{self._players[self._opponent_index].name} wins!")
 
             # check for draws (board is full)
-            if self.is_full(self._disks):
+            if self.is_full(self._position):
                 self._game_over = True
                 self._game_over_popup.update_message("Draw!")
 
+            if self._game_over and self._profiler is not None:
+                print("profile report: " + str(self._profiler.end_game()))
+
             while self._game_over:
                 # draw the popup
-                self.draw()
-                pygame.display.update()
+                pygame.display.update(self.draw())
+                self._clock.tick(self._frame_rate)
 
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
-                        sys.exit(0)
+                        self.quit()
 
                     self._game_over_popup.process_events(event)
                     
                     # exit if "Exit Game" button is pressed
                     if self._game_over_popup.buttons[0].clicked:
-                        sys.exit(0)
+                        self.quit()
 
                     # Restart the game if "Play Again" button is pressed
                     if self._game_over_popup.buttons[1].clicked:
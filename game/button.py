@@ -1,4 +1,5 @@
 import pygame
+from . import text as cached_text
 
 class Button:
     """Creates a clickable button"""
@@ -19,8 +20,7 @@ class Button:
         )
         self._clicked = False
         # set the text
-        font = pygame.font.Font(None, int(height / 1.5))
-        self._text = font.render(text, True, (255, 255, 255))
+        self._text = cached_text.render(text, int(height / 1.5), (255, 255, 255))
         self._textpos = self._text.get_rect()
         self._textpos.centerx = self._rect.centerx
         self._textpos.centery = self._rect.centery
@@ -35,6 +35,11 @@ class Button:
         """Returns the button's value"""
         return self._value
     
+    @property
+    def color(self):
+        """Returns the button's current color"""
+        return self._color
+
     @property
     def clicked(self):
         """Returns true if button has been clicked"""
@@ -6,6 +6,20 @@ class Disk(pygame.sprite.Sprite):
     _images = {'red': pygame.image.load('game/red_disk.bmp'), 
         'yellow': pygame.image.load('game/yellow_disk.bmp'),
         'white': pygame.image.load('game/white_disk.bmp')}
+    _scaled = {} # (color, width) -> image scaled for the display, shared by every disk
+
+    @classmethod
+    def sprite(cls, color, width):
+        """Returns the color's image scaled to width, scaling it only the first time"""
+        key = (color, width)
+        sprite = cls._scaled.get(key)
+        if sprite is None:
+            sprite = pygame.transform.scale(cls._images[color], (width, width))
+            # once there is a display, match its pixel format so blits don't convert every frame
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+                cls._scaled[key] = sprite
+        return sprite
 
     def __init__(self, screen, color, center, width):
         """Initialize the disk based on color"""
@@ -15,7 +29,7 @@ class Disk(pygame.sprite.Sprite):
         self._center = center
         self._width = width
         # create the sprite
-        self._sprite = pygame.transform.scale(Disk._images[color], (width, width))
+        self._sprite = Disk.sprite(color, width)
         # get the bounding rect of the sprite
         self._rect = self._sprite.get_rect()
         self._rect.center = center # set the center
@@ -53,7 +67,7 @@ class Disk(pygame.sprite.Sprite):
     @color.setter
     def color(self, color):
         """Update sprite to match the new color"""
-        self._sprite = pygame.transform.scale(Disk._images[color], (self._width, self._width))
+        self._sprite = Disk.sprite(color, self._width)
         self._color = color
 
     def is_empty(self):
@@ -1,4 +1,5 @@
 import pygame
+from . import text as cached_text
 
 class Popup:
     """Class used to create pop-ups."""
@@ -11,6 +12,9 @@ class Popup:
         self._size = size
         self._color = (191, 228, 252)
         self._rect = pygame.Rect(position[0], position[1], size[0], size[1])
+        # the translucent backdrop never changes, so it is built once
+        self._overlay = pygame.Surface(self._rect.size, pygame.SRCALPHA)
+        pygame.draw.rect(self._overlay, (191, 228, 252, 60), self._overlay.get_rect())
 
     @property
     def rect(self):
@@ -24,15 +28,12 @@ class Popup:
 
     def draw(self):
         """Draw the pop-up."""
-        font = pygame.font.Font(None, int(self._size[1] * 0.10))
-        text = font.render(self._message, True, (0,0,0))
+        text = cached_text.render(self._message, int(self._size[1] * 0.10), (0,0,0))
         textpos = text.get_rect()
         textpos.centerx = self.rect.centerx
         textpos.centery = self.rect.centery - 103
 
-        surface = pygame.Surface(pygame.Rect(self.rect).size, pygame.SRCALPHA)
-        pygame.draw.rect(surface, (191, 228, 252, 60), surface.get_rect())
-        self._screen.blit(surface, self.rect)
+        self._screen.blit(self._overlay, self.rect)
         self._screen.blit(text, textpos)
         for button in self._buttons:
             button.draw()
@@ -2,6 +2,7 @@ import pygame, sys
 from pygame.locals import *
 from .button import Button
 from .board import Board
+from . import text as cached_text
 # keeps track of game board size
 ROWS = None
 COLUMNS = None
@@ -22,6 +23,7 @@ class SceneManager:
         self._scenes = []
         self._current_index = TITLE_SCENE_INDEX
         self._efs = []
+        self._clock = pygame.time.Clock() # paces every scene's loop
     
     def add_scene(self, scene):
         """Adds a scene to be managed"""
@@ -52,6 +54,14 @@ class SceneManager:
         """Returns the current scene"""
         return self._scenes[self._current_index]
 
+    def run_current_scene(self):
+        """Starts and runs the current scene, then switches scenes if it asked to"""
+        scene = self.current_scene
+        scene.start_scene()
+        scene.run(self._clock)
+        if scene.requests_scene_switch:
+            self.switch_scene(scene.next_scene_index)
+
 class Scene:
     """Parent class for creating scenes."""
     def __init__(self, screen, background_color):
@@ -69,6 +79,30 @@ class Scene:
         """Draw the scene"""
         self._screen.blit(self._screen, (0, 0))
 
+    def process_event(self, event):
+        """Handles one event, setting _needs_redraw if the scene changed"""
+
+    def run(self, clock):
+        """Runs the scene until it stops, redrawing only after an event changed it
+
+        The loop sleeps in pygame.event.wait until something happens, so an
+        idle menu costs no CPU, and clock keeps redraws to the frame rate.
+        """
+        self._needs_redraw = True
+        while self._scene_is_running:
+            if self._needs_redraw:
+                self._needs_redraw = False
+                self._screen.fill(self._background_color)
+                self.draw()
+                pygame.display.update()
+            self.process_event(pygame.event.wait())
+            # handle whatever else queued up before the next frame
+            for event in pygame.event.get():
+                if not self._scene_is_running:
+                    break
+                self.process_event(event)
+            clock.tick(self._frame_rate)
+
     @property
     def screen_width(self):
         """Get the screen's width"""
@@ -123,6 +157,7 @@ class TitleScene(Scene):
             Button(self._screen, (int(self.screen_width * 0.875 - 25), self.screen_height * 0.80 + 75), "Settings", 2, 150, 50, (0,0,255))]
         self._requests_scene_switch = False # tracks if new scene is going to run
         self._next_scene_index = None # tracks the index of new scene
+        self._needs_redraw = True
 
     def start_scene(self):
         """Start the scene"""
@@ -134,8 +169,7 @@ class TitleScene(Scene):
 
         # Draw "Connect 4" title
         title_rect = pygame.Rect(self.screen_width / 2 - 150, 50, 300, 100)
-        font = pygame.font.Font(None, 100)
-        text = font.render("Connect 4", True, (255, 255, 255))
+        text = cached_text.render("Connect 4", 100, (255, 255, 255))
         textpos = text.get_rect()
         textpos.centerx = title_rect.centerx
         textpos.centery = title_rect.centery
@@ -144,8 +178,7 @@ class TitleScene(Scene):
 
         # Draw "AI vs AI"
         option1_rect =  pygame.Rect(self.screen_width * 0.125, self.screen_height * 0.33, 600, 100)
-        font = pygame.font.Font(None, 75)
-        text = font.render("AI vs AI", True, (255, 255, 255))
+        text = cached_text.render("AI vs AI", 75, (255, 255, 255))
         textpos = text.get_rect()
         textpos.centerx = option1_rect.centerx * 0.60 # shift left
         textpos.centery = option1_rect.centery
@@ -154,8 +187,7 @@ class TitleScene(Scene):
 
         # Draw "Player vs AI"
         option2_rect =  pygame.Rect(self.screen_width * 0.125 , self.screen_height * 0.50, 600, 100)
-        font = pygame.font.Font(None, 75)
-        text = font.render("Player vs AI", True, (255, 255, 255))
+        text = cached_text.render("Player vs AI", 75, (255, 255, 255))
         textpos = text.get_rect()
         textpos.centerx = option2_rect.centerx * 0.7 # shift left
         textpos.centery = option2_rect.centery
@@ -166,44 +198,47 @@ class TitleScene(Scene):
         for button in self._buttons:
             button.draw()
     
-    def run(self):
-        """Process game events for the scene"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit(0)
-            for button in self._buttons:
-                button.process_events(event)
-                if button.clicked:
-                    # stop the current scene
-                    self._scene_is_running = False
-
-                    # unclick the button
-                    button.toggle()
-
-                    # update the selection choice
-                    global SELECTION
-                    SELECTION = button.value
-
-                    # make a request to switch scenes
-                    self._requests_scene_switch = True 
-
-                    # set the new scene index
-                    if SELECTION == 0 or SELECTION == 1:
-                        self._next_scene_index = VIDEOGAME_SCENE_INDEX # VideoGameScene is the next scene
-                    elif SELECTION == 2:
-                        self._next_scene_index = SETTINGS_SCENE_INDEX # SettingsScene is the next scene
-            self.draw()
-            pygame.display.update()
+    def process_event(self, event):
+        """Process a game event for the scene"""
+        if event.type == pygame.QUIT:
+            sys.exit(0)
+        for button in self._buttons:
+            color = button.color
+            button.process_events(event)
+            # redraw when the mouse moves on or off a button
+            if button.color != color:
+                self._needs_redraw = True
+            if button.clicked:
+                # stop the current scene
+                self._scene_is_running = False
+
+                # unclick the button
+                button.toggle()
+
+                # update the selection choice
+                global SELECTION
+                SELECTION = button.value
+
+                # make a request to switch scenes
+                self._requests_scene_switch = True 
+
+                # set the new scene index
+                if SELECTION == 0 or SELECTION == 1:
+                    self._next_scene_index = VIDEOGAME_SCENE_INDEX # VideoGameScene is the next scene
+                elif SELECTION == 2:
+                    self._next_scene_index = SETTINGS_SCENE_INDEX # SettingsScene is the next scene
 
 class VideoGameScene(Scene):
     """Class used to create an instance of Connect 4"""
-    def __init__(self, screen, backgound_color):
+    def __init__(self, screen, backgound_color, profiler=None, book=None):
         """Initialize the scene"""
         self._frame_rate = FRAME_RATE
         self._screen = screen
         self._background_color = backgound_color
         self._scene_is_running = True
         self._board = None
+        self._profiler = profiler # profiles the AI's moves if set
+        self._book = book # opening book for the AI whose EVs it was built for, if any
         self._requests_scene_switch = False # tracks if new scene is going to run
         self._next_scene_index = None   # tracks the index of new scene
         self._efs = [
@@ -221,7 +256,7 @@ class VideoGameScene(Scene):
 
     def start_scene(self):
         """Start the scene"""
-        self._board = Board(self._screen, 6, 7, SELECTION, self._efs)
+        self._board = Board(self._screen, 6, 7, SELECTION, self._efs, profiler=self._profiler, book=self._book)
         self._screen.fill(self._background_color)
     
     def draw(self):
@@ -229,8 +264,8 @@ class VideoGameScene(Scene):
         # draw the game board and pieces
         self._board.draw()
 
-    def run(self):
-        """Runs an instance of Connect 4"""
+    def run(self, clock):
+        """Runs an instance of Connect 4, the board paces its own frames"""
         self._board.run()
 
 class SettingsScene(Scene):
@@ -254,6 +289,7 @@ class SettingsScene(Scene):
         ]
         self._requests_scene_switch = False # tracks if new scene is going to run
         self._next_scene_index = None   # tracks the index of new scene
+        self._needs_redraw = True
 
     @property
     def items(self):
@@ -270,8 +306,7 @@ class SettingsScene(Scene):
 
         # Draw title
         title_rect = pygame.Rect(self.screen_width / 2 - 150, 50, 300, 100)
-        font = pygame.font.Font(None, 100)
-        text = font.render("Settings AI 2", True, (255, 255, 255))
+        text = cached_text.render("Settings AI 2", 100, (255, 255, 255))
         textpos = text.get_rect()
         textpos.centerx = title_rect.centerx
         textpos.centery = title_rect.centery
@@ -279,7 +314,7 @@ class SettingsScene(Scene):
 
         # Draw items
         item_height = 200
-        font = pygame.font.Font(None, 50)
+        font_size = 50
         checkbox_width = 20
         checkbox_margin = 10
 
@@ -294,7 +329,7 @@ class SettingsScene(Scene):
                                 (checkbox_rect.right - 5, checkbox_rect.top + 5), 2)
 
             # Draw text
-            text = font.render(item["name"], True, (255, 255, 255))
+            text = cached_text.render(item["name"], font_size, (255, 255, 255))
             textpos = text.get_rect()
             textpos.left = checkbox_rect.right + checkbox_margin  # Adjust the horizontal position
             textpos.centery = item_height - 15
@@ -306,47 +341,41 @@ class SettingsScene(Scene):
         for button in self._buttons:
             button.draw()
 
-        pygame.display.update()
-
     def toggle_item(self, index):
         """Toggle the selected state of an item."""
         self._items[index]["selected"] = not self._items[index]["selected"]
 
-    def run(self):
-        """Process game events for the scene"""
-        while self._scene_is_running:
-            button_clicked = False  # Flag to track whether a button was clicked
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    sys.exit(0)
-
-                # Handle checkbox clicks
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    for i, item in enumerate(self._items):
-                        checkbox_rect = pygame.Rect(self.screen_width / 2 - 200, 200 + 50 * i - 25, 20, 20)
-                        if checkbox_rect.collidepoint(event.pos):
-                            self.toggle_item(i)
-                            print(f"{item['name']} {'selected' if item['selected'] else 'deselected'}")
-
-                for button in self._buttons:
-                    button.process_events(event)
-                    if button.clicked:
-                        button_clicked = True  # Set the flag to True when a button is clicked
-
-            if button_clicked and event.type == pygame.MOUSEBUTTONUP:
-                # Process the button click only once when the mouse button is released
-                for button in self._buttons:
-                    if button.clicked:
-                        # stop the current scene
-                        button.toggle()
-                        # request and update new scene index
-                        self._scene_is_running = False
-                        self._requests_scene_switch = True
-                        self._next_scene_index = TITLE_SCENE_INDEX # next scene is TitleScene
-
-            # Clear the screen
-            self._screen.fill(self._background_color)
-
-            self.draw()
-            pygame.display.update()
\ No newline at end of file
+    def process_event(self, event):
+        """Process a game event for the scene"""
+        if event.type == pygame.QUIT:
+            sys.exit(0)
+
+        # Handle checkbox clicks
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            for i, item in enumerate(self._items):
+                checkbox_rect = pygame.Rect(self.screen_width / 2 - 200, 200 + 50 * i - 25, 20, 20)
+                if checkbox_rect.collidepoint(event.pos):
+                    self.toggle_item(i)
+                    self._needs_redraw = True
+                    print(f"{item['name']} {'selected' if item['selected'] else 'deselected'}")
+
+        button_clicked = False  # Flag to track whether a button was clicked
+        for button in self._buttons:
+            color = button.color
+            button.process_events(event)
+            # redraw when the mouse moves on or off a button
+            if button.color != color:
+                self._needs_redraw = True
+            if button.clicked:
+                button_clicked = True  # Set the flag to True when a button is clicked
+
+        if button_clicked and event.type == pygame.MOUSEBUTTONUP:
+            # Process the button click only once when the mouse button is released
+            for button in self._buttons:
+                if button.clicked:
+                    # stop the current scene
+                    button.toggle()
+                    # request and update new scene index
+                    self._scene_is_running = False
+                    self._requests_scene_switch = True
+                    self._next_scene_index = TITLE_SCENE_INDEX # next scene is TitleScene
@@ -0,0 +1,12 @@
+import functools
+import pygame
+
+@functools.lru_cache(maxsize=None)
+def font(size):
+    """Returns the default font at the given size, loading it once"""
+    return pygame.font.Font(None, size)
+
+@functools.lru_cache(maxsize=256)
+def render(text, size, color):
+    """Returns the text rendered in the default font, rendering each (text, size, color) once"""
+    return font(size).render(text, True, color)
@@ -2,8 +2,20 @@
 #
 # The file creates and runs an instance of Connect 4.
 
+import argparse
+
 from game.game import Game
+from engine import OpeningBook
+from engine.profiling import MoveProfiler
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Connect Four with a graphical UI")
+    parser.add_argument("--profile", metavar="DIR", help="Profile every AI move with cProfile and write the profiles and a report to DIR")
+    parser.add_argument("--book", help="Opening book file made by connect4/build_book.py, used by the AI whose EVs it was built for")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    GAME = Game()
-    GAME.run()
\ No newline at end of file
+    args = parse_args()
+    GAME = Game(profiler=MoveProfiler(args.profile) if args.profile else None,
+                book=OpeningBook(args.book) if args.book else None)
+    GAME.run()
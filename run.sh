@@ -1,9 +1,8 @@
 #!/bin/bash
 
-# Specify the number of times to run the command
+# Specify the number of games to play
 num_runs=1000
 
-# Loop to run the command
-for ((i = 1; i <= num_runs; i++)); do
-  python3 game3.py
-done
\ No newline at end of file
+# Play the games with tournament.py, spread over a pool of worker processes (one per
+# CPU core unless --workers is given); extra arguments (like --ai2 1,5) are passed through
+cd "$(dirname "$0")/connect4" && python3 tournament.py --games "$num_runs" "$@"